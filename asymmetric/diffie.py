@@ -1,7 +1,6 @@
 import streamlit as st
-
-def mod_exp(base, exp, mod):
-    return pow(base, exp, mod)
+from asymmetric.modexp import fixed_base_pow, mod_exp
+from symmetric.vigenere import vigenere_transform
 
 def generate_vigenere_key(shared_key, length):
     shifts = [chr((int(digit) % 26) + ord('a')) for digit in str(shared_key)]
@@ -9,26 +8,12 @@ def generate_vigenere_key(shared_key, length):
     return (key * (length // len(key) + 1))[:length]
 
 def vigenere_encrypt(text, key):
-    result = []
-    for i, char in enumerate(text):
-        if char.isalpha():
-            shift = ord(key[i]) - ord('a')
-            enc = (ord(char.lower()) - ord('a') + shift) % 26
-            result.append(chr(enc + ord('a')))
-        else:
-            result.append(char)
-    return ''.join(result)
+    result, _ = vigenere_transform(text.encode("utf-8", "surrogatepass"), key, lowercase=True)
+    return result.decode("utf-8", "surrogatepass")
 
 def vigenere_decrypt(text, key):
-    result = []
-    for i, char in enumerate(text):
-        if char.isalpha():
-            shift = ord(key[i]) - ord('a')
-            dec = (ord(char.lower()) - ord('a') - shift) % 26
-            result.append(chr(dec + ord('a')))
-        else:
-            result.append(char)
-    return ''.join(result)
+    result, _ = vigenere_transform(text.encode("utf-8", "surrogatepass"), key, decrypt=True, lowercase=True)
+    return result.decode("utf-8", "surrogatepass")
 
 
 def is_prime(n: int) -> bool:
@@ -107,7 +92,7 @@ def render():
     private_key = st.number_input("Enter your private key:", min_value=1, value=8)
 
     if is_prime(p) and is_primitive_root(g, p):
-        public_key = mod_exp(g, private_key, p)
+        public_key = fixed_base_pow(g, private_key, p)
         st.write(f"🔑 Your Public Key: `{public_key}`")
 
         other_public = st.number_input("Enter received public key from other party:", min_value=1, value=3)
@@ -0,0 +1,147 @@
+import functools
+import os
+import time
+
+# Shared modular exponentiation for RSA and Diffie-Hellman.
+#
+# mod_exp is the default everywhere and is the builtin pow, which runs the
+# same windowed algorithm in C. square_and_multiply and sliding_window_exp
+# are the textbook versions kept for teaching: both can record every step
+# in a trace list. FixedBaseTable precomputes powers of one base (a
+# Diffie-Hellman generator, say) so later exponentiations need no
+# squarings at all. benchmark() compares them.
+
+WINDOW_BITS = 4
+# Below this modulus size a table costs more than it saves.
+FIXED_BASE_MIN_BITS = 256
+BENCHMARK_BITS = (512, 1024, 2048, 3072, 4096)
+
+def mod_exp(base, exp, mod):
+    return pow(base, exp, mod)
+
+def square_and_multiply(base, exp, mod, trace=None):
+    # Left-to-right binary method: square for every exponent bit, multiply
+    # when the bit is 1.
+    if mod == 1:
+        return 0
+    base %= mod
+    result = 1
+    for bit in bin(exp)[2:]:
+        result = result * result % mod
+        if trace is not None:
+            trace.append(("square", bit, result))
+        if bit == "1":
+            result = result * base % mod
+            if trace is not None:
+                trace.append(("multiply", bit, result))
+    return result
+
+def sliding_window_exp(base, exp, mod, k=WINDOW_BITS, trace=None):
+    # Sliding-window method: precompute the odd powers base^1, base^3, ...,
+    # base^(2^k - 1), then scan the exponent from the top, squaring through
+    # zero bits and taking windows of up to k bits that end in a 1, each
+    # costing a single multiplication by a precomputed power.
+    if mod == 1:
+        return 0
+    base %= mod
+    square = base * base % mod
+    odd = [base]
+    for _ in range((1 << (k - 1)) - 1):
+        odd.append(odd[-1] * square % mod)
+    bits = bin(exp)[2:]
+    result = 1
+    i = 0
+    while i < len(bits):
+        if bits[i] == "0":
+            result = result * result % mod
+            if trace is not None:
+                trace.append(("square", "0", result))
+            i += 1
+            continue
+        j = min(i + k, len(bits))
+        while bits[j - 1] == "0":
+            j -= 1
+        window = bits[i:j]
+        for _ in window:
+            result = result * result % mod
+        result = result * odd[int(window, 2) >> 1] % mod
+        if trace is not None:
+            trace.append((f"square x{len(window)}, multiply by base^{int(window, 2)}", window, result))
+        i = j
+    return result
+
+class FixedBaseTable:
+    # Powers base^(d * 2^(k*i)) mod mod for every k-bit digit d and digit
+    # position i up to max_bits. pow(exp) multiplies one entry per nonzero
+    # digit of exp, so it skips every squaring; worth it when the same base
+    # is raised to many exponents.
+    def __init__(self, base, mod, max_bits, k=WINDOW_BITS):
+        self.base = base % mod
+        self.mod = mod
+        self.k = k
+        self.max_bits = max_bits
+        self.rows = []
+        step = self.base
+        for _ in range(-(-max_bits // k)):
+            row = [1, step]
+            for _ in range((1 << k) - 2):
+                row.append(row[-1] * step % mod)
+            self.rows.append(row)
+            step = row[-1] * step % mod
+        self.mask = (1 << k) - 1
+
+    def pow(self, exp):
+        if exp < 0 or exp.bit_length() > self.max_bits:
+            return pow(self.base, exp, self.mod)
+        result = 1
+        for row in self.rows:
+            if not exp:
+                break
+            digit = exp & self.mask
+            if digit:
+                result = result * row[digit] % self.mod
+            exp >>= self.k
+        return result % self.mod
+
+@functools.lru_cache(maxsize=8)
+def fixed_base_table(base, mod):
+    return FixedBaseTable(base, mod, mod.bit_length())
+
+def fixed_base_pow(base, exp, mod):
+    # Default for a base that is raised over and over, such as a
+    # Diffie-Hellman generator: a cached FixedBaseTable for large moduli,
+    # plain pow otherwise.
+    if mod.bit_length() < FIXED_BASE_MIN_BITS:
+        return pow(base, exp, mod)
+    return fixed_base_table(base, mod).pow(exp)
+
+def _time(fn, reps):
+    start = time.perf_counter()
+    for _ in range(reps):
+        fn()
+    return (time.perf_counter() - start) / reps
+
+def benchmark(bits=BENCHMARK_BITS, reps=5):
+    # Seconds per exponentiation with full-size base, exponent and odd
+    # modulus for each size. fixed_base excludes building its table.
+    rows = []
+    for size in bits:
+        mod = int.from_bytes(os.urandom(size // 8), "big") | (1 << (size - 1)) | 1
+        base = int.from_bytes(os.urandom(size // 8), "big") % mod
+        exp = int.from_bytes(os.urandom(size // 8), "big")
+        table = FixedBaseTable(base, mod, size)
+        expected = pow(base, exp, mod)
+        assert square_and_multiply(base, exp, mod) == sliding_window_exp(base, exp, mod) == table.pow(exp) == expected
+        rows.append({
+            "bits": size,
+            "pow": _time(lambda: pow(base, exp, mod), reps),
+            "sliding_window": _time(lambda: sliding_window_exp(base, exp, mod), reps),
+            "square_and_multiply": _time(lambda: square_and_multiply(base, exp, mod), reps),
+            "fixed_base": _time(lambda: table.pow(exp), reps),
+        })
+    return rows
+
+if __name__ == "__main__":
+    for row in benchmark():
+        print(f"{row['bits']:>5} bits: " + ", ".join(
+            f"{name} {row[name] * 1000:.2f} ms" for name in ("pow", "sliding_window", "square_and_multiply", "fixed_base")))
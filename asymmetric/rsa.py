@@ -1,35 +1,281 @@
 import streamlit as st
+import os
+import secrets
+import time
+from collections import OrderedDict
 from math import gcd
-
-def is_prime(n):
-    if n <= 1:
-        return False
-    if n <= 3:
-        return True
-    if n % 2 == 0 or n % 3 == 0:
-        return False
-    i = 5
-    while i * i <= n:
-        if n % i == 0 or n % (i + 2) == 0:
+from asymmetric.modexp import mod_exp, sliding_window_exp
+from symmetric.parallel import ordered_map
+
+# Odd primes below 2000, used to weed out most candidates before Miller-Rabin.
+SMALL_PRIMES = [p for p in range(3, 2000, 2) if all(p % d for d in range(3, int(p ** 0.5) + 1, 2))]
+
+# These bases make Miller-Rabin deterministic for every n < 3.18 * 10^23,
+# which covers all 64-bit inputs; larger n get MR_ROUNDS random bases.
+MR_BASES_64 = (2, 3, 5, 7, 11, 13, 17, 19, 23, 29, 31, 37)
+MR_ROUNDS = 40
+KEY_SIZES = [512, 1024, 2048, 3072, 4096]
+SIEVE_SPAN = 4096
+LENGTH_HEADER = 4
+ENCODINGS = ["Per character", "Packed blocks"]
+TABLE_MAX_ENTRIES = 8192
+TABLE_PREFILL = 256
+BATCH_SIZE = 64
+# Below this many numbers x (bits of n)^2 (about 2^25, some 50 ms of
+# decryption) starting worker processes costs more than it saves.
+PARALLEL_MIN_COST = 1 << 25
+
+def _miller_rabin(n, bases):
+    d, s = n - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+    for a in bases:
+        x = pow(a, d, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
             return False
-        i += 6
     return True
 
-def mod_exp(base, exp, mod):
-    result = 1
-    base %= mod
-    while exp > 0:
-        if exp % 2:
-            result = (result * base) % mod
-        exp //= 2
-        base = (base * base) % mod
-    return result
+def is_prime(n, rounds=MR_ROUNDS):
+    if n <= 3:
+        return n >= 2
+    if n % 2 == 0:
+        return False
+    for p in SMALL_PRIMES:
+        if n % p == 0:
+            return n == p
+    if n < 1 << 64:
+        return _miller_rabin(n, MR_BASES_64)
+    return _miller_rabin(n, [2 + secrets.randbelow(n - 3) for _ in range(rounds)])
+
+def random_prime(bits):
+    # Random prime with the top two bits set, so the product of two of them
+    # has exactly 2 * bits bits. Candidates base + 2k for k < SIEVE_SPAN are
+    # sieved by the small primes first; only survivors get Miller-Rabin.
+    while True:
+        base = secrets.randbits(bits) | (3 << (bits - 2)) | 1
+        sieve = bytearray([1]) * SIEVE_SPAN
+        for p in SMALL_PRIMES:
+            # First k with base + 2k divisible by p.
+            first = (-base * pow(2, -1, p)) % p
+            sieve[first::p] = bytes(len(range(first, SIEVE_SPAN, p)))
+        for k in range(SIEVE_SPAN):
+            candidate = base + 2 * k
+            if candidate.bit_length() != bits:
+                break
+            if sieve[k] and is_prime(candidate):
+                return candidate
+
+def generate_keypair(bits=2048, e=65537):
+    # Returns (p, q, n, t, e, d) for a bits-bit modulus n = p * q.
+    while True:
+        p = random_prime(bits // 2)
+        q = random_prime(bits - bits // 2)
+        t = (p - 1) * (q - 1)
+        if p != q and gcd(e, t) == 1:
+            return p, q, p * q, t, e, pow(e, -1, t)
 
 def mod_inverse(e, t):
-    for d in range(2, t):
-        if (e * d) % t == 1:
-            return d
-    return None
+    # Extended Euclid via pow(e, -1, t); None when e has no inverse mod t.
+    try:
+        return pow(e, -1, t)
+    except ValueError:
+        return None
+
+class PrivateKey:
+    # RSA private key. With the factors p and q it decrypts through the
+    # Chinese Remainder Theorem: two exponentiations with half-size moduli
+    # and exponents (dp, dq), recombined with qinv, about 3-4x faster than
+    # one exponentiation mod n. With only (d, n) it falls back to c^d mod n.
+    def __init__(self, d, n, p=None, q=None):
+        self.d = d
+        self.n = n
+        self.p = self.q = None
+        if p and q and p != q and p * q == n:
+            if q > p:
+                p, q = q, p
+            self.p, self.q = p, q
+            self.dp = d % (p - 1)
+            self.dq = d % (q - 1)
+            self.qinv = pow(q, -1, p)
+
+    @property
+    def has_crt(self):
+        return self.p is not None
+
+    def decrypt(self, c):
+        if not self.has_crt:
+            return mod_exp(c, self.d, self.n)
+        m1 = mod_exp(c, self.dp, self.p)
+        m2 = mod_exp(c, self.dq, self.q)
+        return m2 + (self.qinv * (m1 - m2) % self.p) * self.q
+
+class CodepointTable:
+    # Memo of per-character textbook RSA for one public key (e, n). Since
+    # encryption is deterministic, forward maps codepoint -> ciphertext and
+    # reverse maps it back, so a message costs one exponentiation per
+    # distinct character. forward is an LRU bounded by max_entries; evicted
+    # entries leave reverse too. Codepoints >= n encrypt like codepoint % n,
+    # so only codepoints below n go into reverse, keeping it one-to-one.
+    def __init__(self, e, n, max_entries=TABLE_MAX_ENTRIES):
+        self.e = e
+        self.n = n
+        self.max_entries = max_entries
+        self.forward = OrderedDict()
+        self.reverse = {}
+        self.hits = 0
+        self.misses = 0
+
+    def matches(self, e, n):
+        return (self.e, self.n) == (e, n)
+
+    def _store(self, codepoint, c):
+        self.forward[codepoint] = c
+        if codepoint < self.n:
+            self.reverse[c] = codepoint
+        while len(self.forward) > self.max_entries:
+            evicted, evicted_c = self.forward.popitem(last=False)
+            if self.reverse.get(evicted_c) == evicted:
+                del self.reverse[evicted_c]
+
+    def prefill(self, limit=TABLE_PREFILL):
+        # Bulk-builds the Latin-1 range (or codepoints below limit).
+        for codepoint in range(min(limit, self.n)):
+            if codepoint not in self.forward:
+                self._store(codepoint, mod_exp(codepoint, self.e, self.n))
+
+    def encrypt_codepoint(self, codepoint):
+        c = self.forward.get(codepoint)
+        if c is None:
+            self.misses += 1
+            c = mod_exp(codepoint, self.e, self.n)
+            self._store(codepoint, c)
+        else:
+            self.hits += 1
+            self.forward.move_to_end(codepoint)
+        return c
+
+    def encrypt(self, text):
+        return [self.encrypt_codepoint(ord(ch)) for ch in text]
+
+    def fits(self, private_key):
+        # The reverse dict may only stand in for a private key that really
+        # inverts (e, n); otherwise a wrong d would still "decrypt".
+        probe = 2 % self.n
+        return private_key.n == self.n and private_key.decrypt(mod_exp(probe, self.e, self.n)) == probe
+
+    def decrypt(self, numbers, private_key, workers=None, progress=None, cancel=None):
+        # Call only when fits(private_key). Each distinct ciphertext missing
+        # from the table is decrypted once (through decrypt_many) and stored
+        # only if it re-encrypts to c, so ciphertexts from another key never
+        # enter it. Every number is resolved from the table as it was before
+        # the call, since storing new entries can evict ones still needed
+        # further down. Stops at the first number a cancelled run did not
+        # reach.
+        known = {c: self.reverse[c] for c in set(numbers) if c in self.reverse}
+        missing = [c for c in dict.fromkeys(numbers) if c not in known]
+        decrypted = []
+        try:
+            decrypt_many(missing, private_key, workers, progress=progress, cancel=cancel, out=decrypted)
+        finally:
+            found = dict(zip(missing, decrypted))
+            codepoints = []
+            for c in numbers:
+                codepoint = known.get(c)
+                if codepoint is None:
+                    codepoint = found.get(c)
+                    if codepoint is None:
+                        break
+                else:
+                    self.hits += 1
+                codepoints.append(codepoint)
+            for codepoint in known.values():
+                if codepoint in self.forward:
+                    self.forward.move_to_end(codepoint)
+            for c, codepoint in found.items():
+                if mod_exp(codepoint, self.e, self.n) == c:
+                    self._store(codepoint, c)
+            self.misses += len(missing)
+        return codepoints
+
+def codepoint_table(state, e, n):
+    # The table kept in state (st.session_state on the page); a different
+    # key replaces it.
+    table = state.get("rsa_codepoint_table")
+    if table is None or not table.matches(e, n):
+        table = state["rsa_codepoint_table"] = CodepointTable(e, n)
+        table.prefill()
+    return table
+
+# Packed block encoding: the UTF-8 message is prefixed with its byte length
+# (4 bytes, big-endian), filled up with random bytes to a whole number of
+# k-byte blocks, where k = (bits of n - 1) // 8 so every block is below n,
+# and each block is read as a big-endian integer and encrypted once.
+
+def block_size(n):
+    k = (n.bit_length() - 1) // 8
+    if k < 1:
+        raise ValueError("Modulus is too small for packed blocks (n must be at least 256).")
+    return k
+
+def encode_blocks(text, n):
+    k = block_size(n)
+    data = text.encode("utf-8")
+    data = len(data).to_bytes(LENGTH_HEADER, "big") + data
+    data += os.urandom(-len(data) % k)
+    return [int.from_bytes(data[i:i + k], "big") for i in range(0, len(data), k)]
+
+def decode_blocks(numbers, n):
+    k = block_size(n)
+    try:
+        data = b"".join(m.to_bytes(k, "big") for m in numbers)
+    except OverflowError:
+        raise ValueError("A block does not fit the modulus; wrong key or encoding?") from None
+    length = int.from_bytes(data[:LENGTH_HEADER], "big")
+    if len(data) < LENGTH_HEADER or length > len(data) - LENGTH_HEADER:
+        raise ValueError("Length header does not match the data; wrong key or encoding?")
+    return data[LENGTH_HEADER:LENGTH_HEADER + length].decode("utf-8")
+
+def encrypt_blocks(text, e, n):
+    return [mod_exp(m, e, n) for m in encode_blocks(text, n)]
+
+def decrypt_blocks(numbers, private_key, workers=None, progress=None):
+    blocks, _ = decrypt_many(numbers, private_key, workers, progress=progress)
+    return decode_blocks(blocks, private_key.n)
+
+def _decrypt_batch(private_key, numbers):
+    return [private_key.decrypt(c) for c in numbers]
+
+def decrypt_many(numbers, private_key, workers=None, batch_size=BATCH_SIZE, progress=None, cancel=None, out=None):
+    # Decrypts a list of ciphertext integers in batches on worker processes
+    # (big-int pow holds the GIL, so threads would not help). Results come
+    # back in input order and are appended to out as each batch finishes,
+    # so a caller holding out keeps the decrypted prefix even if the run is
+    # interrupted. progress(done, total) is called after every batch, and a
+    # true cancel() stops early. Small jobs (see PARALLEL_MIN_COST) run
+    # inline. Returns (out, complete).
+    out = [] if out is None else out
+    workers = workers or os.cpu_count() or 1
+    batches = [numbers[i:i + batch_size] for i in range(0, len(numbers), batch_size)]
+    if len(batches) < 2 or len(numbers) * private_key.n.bit_length() ** 2 < PARALLEL_MIN_COST:
+        workers = 1
+    results = ordered_map(_decrypt_batch, ((private_key, batch) for batch in batches), workers, processes=True)
+    try:
+        for decrypted in results:
+            out.extend(decrypted)
+            if progress:
+                progress(len(out), len(numbers))
+            if cancel and cancel():
+                break
+    finally:
+        results.close()
+    return out, len(out) == len(numbers)
 
 def render():
     st.title("🔐 RSA Encryption / Decryption")
@@ -89,69 +335,145 @@ def render():
 
 
     st.subheader("🔧 Key Generation")
-    p = st.number_input("Value of prime number p:", min_value=2, value=53)
-    q = st.number_input("Value of prime number q:", min_value=2, value=61)
+    key_source = st.radio("Key source:", ["Choose primes", "Generate random keypair"], horizontal=True)
 
-    if not is_prime(p) or not is_prime(q):
-        st.error("❌ Both p and q must be prime numbers.")
-        return
+    if key_source == "Choose primes":
+        p = st.number_input("Value of prime number p:", min_value=2, value=53)
+        q = st.number_input("Value of prime number q:", min_value=2, value=61)
 
-    n = p * q
-    t = (p - 1) * (q - 1)
+        if not is_prime(p) or not is_prime(q):
+            st.error("❌ Both p and q must be prime numbers.")
+            return
 
-    e = st.number_input("Enter public key exponent e (coprime with t):", min_value=2, max_value=t-1, value=1409)
+        n = p * q
+        t = (p - 1) * (q - 1)
 
-    if gcd(e, t) != 1:
-        st.error(f"❌ The entered e = {e} is not coprime with t = {t}.")
-        return
+        e = st.number_input("Enter public key exponent e (coprime with t):", min_value=2, max_value=t-1, value=1409)
 
-    d = mod_inverse(e, t)
-    if not d:
-        st.error("❌ Couldn't find modular inverse of e. Try a different value.")
-        return
+        if gcd(e, t) != 1:
+            st.error(f"❌ The entered e = {e} is not coprime with t = {t}.")
+            return
 
-    st.success(f"""
-    ✅ Key Pair Generated:
-    - n = {n}
-    - t = {t}
-    - Public Key (e, n): ({e}, {n})
-    - Private Key (d, n): ({d}, {n})
-    """)
+        d = mod_inverse(e, t)
+        if not d:
+            st.error("❌ Couldn't find modular inverse of e. Try a different value.")
+            return
+
+        st.success(f"""
+        ✅ Key Pair Generated:
+        - n = {n}
+        - t = {t}
+        - Public Key (e, n): ({e}, {n})
+        - Private Key (d, n): ({d}, {n})
+        """)
+    else:
+        bits = st.selectbox("Modulus size (bits):", KEY_SIZES, index=KEY_SIZES.index(2048))
+        # The keypair lives in session_state so reruns reuse it instead of
+        # generating new primes.
+        if st.button("🎲 Generate keypair") or st.session_state.get("rsa_keypair", {}).get("bits") != bits:
+            start = time.perf_counter()
+            p, q, n, t, e, d = generate_keypair(bits)
+            st.session_state.rsa_keypair = {"bits": bits, "p": p, "q": q, "n": n, "t": t, "e": e, "d": d,
+                                            "seconds": time.perf_counter() - start}
+        keypair = st.session_state.rsa_keypair
+        p, q, n, t, e, d = (keypair[k] for k in ("p", "q", "n", "t", "e", "d"))
+        st.success(f"✅ Generated a {bits}-bit keypair in {keypair['seconds']:.2f} s.")
+        with st.expander("🔑 Key values"):
+            st.code(f"p = {p}\nq = {q}\nn = {n}\ne = {e}\nd = {d}", language="text")
 
     st.divider()
+    encoding = st.radio("Message encoding:", ENCODINGS, horizontal=True,
+                        help="Per character encrypts every character's code point on its own. "
+                             "Packed blocks puts as many UTF-8 bytes as fit below n into each number.")
+
     st.subheader("🔒 Encryption")
 
     plain_text = st.text_input("Enter message to encrypt (letters, spaces, symbols allowed):")
+    show_steps = encoding == "Per character" and st.checkbox("Show exponentiation steps for the first character")
     if st.button("Encrypt"):
         if not plain_text.strip():
             st.warning("Please enter a message.")
+        elif encoding == "Packed blocks" and n < 256:
+            st.error("❌ Packed blocks need a modulus n of at least 256.")
         else:
-            cipher_nums = [
-                mod_exp(ord(c), e, n)
-                for c in plain_text
-            ]
+            if encoding == "Packed blocks":
+                cipher_nums = encrypt_blocks(plain_text, e, n)
+                modexps = len(cipher_nums)
+            else:
+                table = codepoint_table(st.session_state, e, n)
+                misses = table.misses
+                cipher_nums = table.encrypt(plain_text)
+                modexps = table.misses - misses
             st.success("🔐 Encrypted Message (as numbers):")
+            st.caption(f"{modexps} modular exponentiations for {len(plain_text)} characters.")
             st.code(' '.join(map(str, cipher_nums)), language="text")
+            if show_steps and encoding == "Per character":
+                steps = []
+                sliding_window_exp(ord(plain_text[0]), e, n, trace=steps)
+                with st.expander(f"🧮 Sliding-window steps for '{plain_text[0]}' ({ord(plain_text[0])}^{e} mod {n})"):
+                    st.dataframe([{"Step": op, "Exponent bits": bits, "Result": str(value)}
+                                  for op, bits, value in steps], hide_index=True)
 
     st.divider()
     st.subheader("🔓 Decryption")
 
     cipher_input = st.text_area("Enter ciphertext numbers (space-separated):", placeholder="Example: 855 1311 2187 ...")
-    priv_d = st.number_input("Enter private key d:", min_value=1, value=d)
-    priv_n = st.number_input("Enter modulus n:", min_value=1, value=n)
+    # Text inputs, since number_input cannot hold integers beyond 64 bits.
+    priv_d = st.text_input("Enter private key d:", value=str(d))
+    priv_n = st.text_input("Enter modulus n:", value=str(n))
+
+    # A run stopped halfway (Stop button or a rerun) leaves its decrypted
+    # prefix in session_state.
+    interrupted = st.session_state.pop("rsa_partial", None)
+    if interrupted is not None and len(interrupted["numbers"]) < interrupted["total"]:
+        st.warning(f"⚠️ The last decryption was interrupted after {len(interrupted['numbers'])} of "
+                   f"{interrupted['total']} numbers.")
+        if interrupted["encoding"] == "Per character":
+            try:
+                st.text_area("Partial result:", value="".join(map(chr, interrupted["numbers"])), height=100)
+            except Exception as err:
+                st.error(f"Partial result could not be shown: {err}")
 
     if st.button("Decrypt"):
         try:
+            priv_d, priv_n = int(priv_d), int(priv_n)
+            # The factors are only known for the key generated above.
+            factors = (p, q) if (priv_d, priv_n) == (d, n) else (None, None)
+            private_key = PrivateKey(priv_d, priv_n, *factors)
             cipher_list = [int(c) for c in cipher_input.strip().split()]
-            decrypted_chars = [
-                chr(mod_exp(c, priv_d, priv_n))
-                for c in cipher_list
-            ]
-            decrypted_message = ''.join(decrypted_chars)
+            bar = st.progress(0.0)
+            progress = lambda done, total: bar.progress(done / total, text=f"Decrypted {done} of {total}")
+            start = time.perf_counter()
+            table = codepoint_table(st.session_state, e, n)
+            if encoding == "Per character" and table.fits(private_key):
+                codepoints = table.decrypt(cipher_list, private_key, progress=progress)
+            else:
+                st.session_state.rsa_partial = {"numbers": [], "total": len(cipher_list), "encoding": encoding}
+                codepoints, _ = decrypt_many(cipher_list, private_key, progress=progress,
+                                             out=st.session_state.rsa_partial["numbers"])
+                del st.session_state.rsa_partial
+            if encoding == "Packed blocks":
+                decrypted_message = decode_blocks(codepoints, priv_n)
+            else:
+                decrypted_chars = [
+                    chr(codepoint)
+                    for codepoint in codepoints
+                ]
+                decrypted_message = ''.join(decrypted_chars)
+            elapsed = time.perf_counter() - start
+            bar.empty()
             st.success("🟢 Decrypted Message:")
+            st.caption(f"{len(cipher_list)} numbers in {elapsed * 1000:.1f} ms using "
+                       + ("CRT (p, q, dp, dq, qinv)." if private_key.has_crt else "plain c^d mod n."))
             st.text_area("Result:", value=decrypted_message, height=150)
-        except Exception as e:
-            st.error(f"Decryption failed: {e}")
+        except Exception as err:
+            st.session_state.pop("rsa_partial", None)
+            st.error(f"Decryption failed: {err}")
+
+    table = st.session_state.get("rsa_codepoint_table")
+    if table is not None and table.matches(e, n):
+        st.caption(f"🗃️ Character table for this key: {len(table.forward)} entries · "
+                   f"{table.hits} hits · {table.misses} misses")
 
     st.markdown("---")
     if st.button("⬅️ Back to Asymmetric Algorithms"):
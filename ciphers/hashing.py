@@ -1,31 +1,770 @@
 import streamlit as st
+import pandas as pd
+import argparse
+import functools
 import hashlib
+import mmap
+import os
+import queue
+import re
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from contextlib import closing
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from itertools import repeat
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+CHUNK_SIZE = 1024 * 1024
+
+ALGORITHMS = {
+    "SHA-256": hashlib.sha256,
+    "MD5": hashlib.md5,
+    "SHA-3(256)": hashlib.sha3_256,
+    "RIPEMD(160)": functools.partial(hashlib.new, 'ripemd160'),
+}
+
+ALL_MODES = "All algorithms"
+
+TREE_LEAF_SIZE = 4 * 1024 * 1024
+
+# The digest index is only created once something is recorded or imported.
+INDEX_PATH = os.environ.get("HASH_INDEX_PATH", "hash_index.sqlite3")
+
+TABLE_CHUNK_ROWS = 200_000
+
+MANIFEST_NAMES = {
+    "SHA-256": "SHA256SUMS",
+    "MD5": "MD5SUMS",
+    "SHA-3(256)": "SHA3-256SUMS",
+    "RIPEMD(160)": "RMD160SUMS",
+}
+
+def iter_chunks(source, chunk_size=CHUNK_SIZE):
+    # Accepts bytes, a binary file-like object or an iterator of byte chunks
+    # and yields at most chunk_size bytes at a time.
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        view = memoryview(source)
+        for start in range(0, len(view), chunk_size):
+            yield view[start:start + chunk_size]
+    elif hasattr(source, "read"):
+        while True:
+            chunk = source.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    else:
+        for chunk in source:
+            yield chunk
+
+def hash_stream(source, mode, chunk_size=CHUNK_SIZE, progress=None):
+    if mode not in ALGORITHMS:
+        return "Unsupported mode"
+    h = ALGORITHMS[mode]()
+    done = 0
+    for chunk in iter_chunks(source, chunk_size):
+        h.update(chunk)
+        done += len(chunk)
+        if progress:
+            progress(done)
+    return h.hexdigest()
+
+def _feed_hasher(h, chunks):
+    while True:
+        chunk = chunks.get()
+        if chunk is None:
+            break
+        h.update(chunk)
+
+def hash_stream_multi(source, modes, chunk_size=CHUNK_SIZE, progress=None, threaded=True):
+    # Reads the source once and fans every chunk out to one hasher per mode.
+    # With threaded=True each hasher runs on its own thread behind a small
+    # bounded queue; hashlib drops the GIL while digesting large buffers.
+    hashers = {mode: ALGORITHMS[mode]() for mode in modes if mode in ALGORITHMS}
+    done = 0
+    if not threaded or len(hashers) < 2:
+        for chunk in iter_chunks(source, chunk_size):
+            for h in hashers.values():
+                h.update(chunk)
+            done += len(chunk)
+            if progress:
+                progress(done)
+    else:
+        queues = [queue.Queue(maxsize=4) for _ in hashers]
+        threads = [threading.Thread(target=_feed_hasher, args=(h, q), daemon=True)
+                   for h, q in zip(hashers.values(), queues)]
+        for t in threads:
+            t.start()
+        try:
+            for chunk in iter_chunks(source, chunk_size):
+                for q in queues:
+                    q.put(chunk)
+                done += len(chunk)
+                if progress:
+                    progress(done)
+        finally:
+            for q in queues:
+                q.put(None)
+            for t in threads:
+                t.join()
+    return {mode: h.hexdigest() for mode, h in hashers.items()}
+
+def hash_file(path, mode, chunk_size=CHUNK_SIZE, progress=None):
+    with open(path, "rb") as f:
+        return hash_stream(f, mode, chunk_size, progress)
 
 def sha_256(data):
-    return hashlib.sha256(data).hexdigest()
+    return hash_stream(data, "SHA-256")
 
 def md5(data):
-    return hashlib.md5(data).hexdigest()
+    return hash_stream(data, "MD5")
 
 def sha_3(data):
-    return hashlib.sha3_256(data).hexdigest()
+    return hash_stream(data, "SHA-3(256)")
 
 def ripemd(data):
-    h = hashlib.new('ripemd160')
+    return hash_stream(data, "RIPEMD(160)")
+
+def hashing(data, mode, progress=None):
+    if mode == ALL_MODES:
+        return hash_stream_multi(data, ALGORITHMS, progress=progress)
+    return hash_stream(data, mode, progress=progress)
+
+def fingerprint(data):
+    # Cheap identity for an input across Streamlit reruns: the upload's
+    # file_id and size for uploaded files, a BLAKE2b of the bytes otherwise.
+    file_id = getattr(data, "file_id", None)
+    if file_id:
+        return f"file:{file_id}:{data.size}"
+    if isinstance(data, (bytes, bytearray, memoryview)):
+        return f"bytes:{len(data)}:{hashlib.blake2b(data, digest_size=16).hexdigest()}"
+    return None
+
+class DigestCache:
+    # Bounded LRU of digest results keyed on (fingerprint, mode). Entries are
+    # evicted oldest-first once either max_entries or max_bytes is exceeded.
+    def __init__(self, max_entries=256, max_bytes=256 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _size(key, value):
+        digests = value.values() if isinstance(value, dict) else [value]
+        return len(key[0]) + len(key[1]) + sum(len(d) for d in digests)
+
+    def peek(self, key):
+        entry = self.entries.get(key)
+        return entry[0] if entry else None
+
+    def get(self, key):
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key][0]
+        self.misses += 1
+        return None
+
+    def put(self, key, value):
+        if key in self.entries:
+            self.total_bytes -= self.entries.pop(key)[1]
+        size = self._size(key, value)
+        self.entries[key] = (value, size)
+        self.total_bytes += size
+        while len(self.entries) > self.max_entries or self.total_bytes > self.max_bytes:
+            _, (_, evicted) = self.entries.popitem(last=False)
+            self.total_bytes -= evicted
+
+    def clear(self):
+        self.entries.clear()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+def _hash_source(source, mode, chunk_size=CHUNK_SIZE):
+    if isinstance(source, (str, os.PathLike)):
+        return hash_file(source, mode, chunk_size)
+    if hasattr(source, "seek"):
+        source.seek(0)
+    return hash_stream(source, mode, chunk_size)
+
+def hash_many(items, mode, workers=None, progress=None, chunk_size=CHUNK_SIZE):
+    # items is a list of (name, source) pairs where source is a path or a
+    # binary file-like object. Files are hashed concurrently on a thread pool
+    # and returned as (name, digest) pairs in input order.
+    if mode not in ALGORITHMS:
+        raise ValueError(f"Unsupported mode: {mode}")
+    items = list(items)
+    digests = [None] * len(items)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(_hash_source, source, mode, chunk_size): i
+                   for i, (_, source) in enumerate(items)}
+        for done, future in enumerate(as_completed(futures), 1):
+            digests[futures[future]] = future.result()
+            if progress:
+                progress(done, len(items))
+    return [(name, digest) for (name, _), digest in zip(items, digests)]
+
+def hash_directory(root, mode, workers=None, progress=None, exclude=()):
+    exclude = {os.path.abspath(path) for path in exclude}
+    items = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            path = os.path.join(dirpath, filename)
+            if os.path.abspath(path) in exclude:
+                continue
+            name = os.path.relpath(path, root).replace(os.sep, "/")
+            items.append((name, path))
+    return hash_many(items, mode, workers, progress)
+
+def format_manifest(entries):
+    # Same layout as sha256sum/md5sum output: "<digest>  <name>". Names with
+    # a backslash or newline are escaped and the line is prefixed with "\\".
+    lines = []
+    for name, digest in entries:
+        if "\\" in name or "\n" in name:
+            name = name.replace("\\", "\\\\").replace("\n", "\\n")
+            lines.append(f"\\{digest}  {name}\n")
+        else:
+            lines.append(f"{digest}  {name}\n")
+    return "".join(lines)
+
+def write_manifest(entries, path):
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        f.write(format_manifest(entries))
+
+def parse_manifest(text):
+    entries = []
+    for line in text.splitlines():
+        if not line.strip() or line.startswith("#"):
+            continue
+        escaped = line.startswith("\\")
+        if escaped:
+            line = line[1:]
+        digest, _, name = line.partition(" ")
+        if name[:1] in (" ", "*"):
+            name = name[1:]
+        if not digest or not name:
+            raise ValueError(f"Malformed manifest line: {line!r}")
+        if escaped:
+            name = re.sub(r"\\(.)", lambda m: "\n" if m.group(1) == "n" else m.group(1), name)
+        entries.append((digest.lower(), name))
+    return entries
+
+def verify_manifest(entries, mode, sources=None, root=".", workers=None, fail_fast=False, progress=None):
+    # Checks (digest, name) entries in parallel. Each name is looked up in
+    # sources (name -> path or file object) or else resolved under root, and
+    # hashed once however often it is listed, so a file object is never read
+    # by two threads. Returns (name, status) pairs in manifest order, status
+    # being "OK", "FAILED" or "MISSING". With fail_fast the check stops at
+    # the first bad entry and only the entries finished so far are returned.
+    if mode not in ALGORITHMS:
+        raise ValueError(f"Unsupported mode: {mode}")
+    statuses = [None] * len(entries)
+    positions = {}
+    for i, (_, name) in enumerate(entries):
+        positions.setdefault(name, []).append(i)
+
+    def actual_digest(name):
+        source = sources.get(name) if sources is not None else os.path.join(root, name)
+        if source is None:
+            return None
+        try:
+            return _hash_source(source, mode)
+        except OSError:
+            return None
+
+    done = 0
+    pool = ThreadPoolExecutor(max_workers=workers)
+    try:
+        futures = {pool.submit(actual_digest, name): name for name in positions}
+        for future in as_completed(futures):
+            actual = future.result()
+            bad = False
+            for i in positions[futures[future]]:
+                statuses[i] = "MISSING" if actual is None else "OK" if actual == entries[i][0] else "FAILED"
+                bad = bad or statuses[i] != "OK"
+                done += 1
+            if progress:
+                progress(done, len(entries))
+            if fail_fast and bad:
+                break
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+    return [(name, status) for (_, name), status in zip(entries, statuses) if status is not None]
+
+# Tree hash format (version 1)
+#
+#   leaf_i = H(0x00 || bytes[i * leaf_size : (i + 1) * leaf_size])
+#   node   = H(0x01 || left || right)
+#
+# H is the selected algorithm over raw (binary) digests. Leaves are paired
+# left to right at each level; an odd node at the end of a level is carried
+# up unchanged. An empty input has the single leaf H(0x00). The 0x00/0x01
+# prefixes keep leaf and node hashes in separate domains as in RFC 6962.
+# The root is only meaningful together with the algorithm and leaf size, so
+# it is shown as "tree1-<mode>-<leaf_size>:<hex root>".
+
+def _leaf_digest(mode, data):
+    h = ALGORITHMS[mode]()
+    h.update(b"\x00")
     h.update(data)
-    return h.hexdigest()
+    return h.digest()
 
-def hashing(data, mode):
-    if mode == "SHA-256":
-        return sha_256(data)
-    elif mode == "MD5":
-        return md5(data)
-    elif mode == "SHA-3(256)":
-        return sha_3(data)
-    elif mode == "RIPEMD(160)":
-        return ripemd(data)
-    else:
-        return "Unsupported mode"
+def _mapped_leaf_digest(mode, mm, start, end):
+    with memoryview(mm) as whole, whole[start:end] as leaf:
+        return _leaf_digest(mode, leaf)
+
+def tree_root(leaves, mode):
+    level = list(leaves) or [_leaf_digest(mode, b"")]
+    while len(level) > 1:
+        parents = []
+        for i in range(0, len(level) - 1, 2):
+            h = ALGORITHMS[mode]()
+            h.update(b"\x01")
+            h.update(level[i])
+            h.update(level[i + 1])
+            parents.append(h.digest())
+        if len(level) % 2:
+            parents.append(level[-1])
+        level = parents
+    return level[0]
+
+def _iter_leaves(source, leaf_size):
+    buf = bytearray()
+    for chunk in iter_chunks(source, leaf_size):
+        if not buf and len(chunk) == leaf_size:
+            yield chunk
+            continue
+        buf += chunk
+        while len(buf) >= leaf_size:
+            yield bytes(buf[:leaf_size])
+            del buf[:leaf_size]
+    if buf:
+        yield bytes(buf)
+
+def _hash_mapped_leaves(path, mode, leaf_size, indices, workers=None, progress=None):
+    # Hashes the given leaf indices of a local file through mmap on a thread
+    # pool; hashlib releases the GIL on large buffers so leaves run in parallel.
+    digests = {}
+    if not indices:
+        return digests
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        size = len(mm)
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(_mapped_leaf_digest, mode, mm, i * leaf_size, min((i + 1) * leaf_size, size)): i
+                       for i in indices}
+            for done, future in enumerate(as_completed(futures), 1):
+                digests[futures[future]] = future.result()
+                if progress:
+                    progress(done, len(futures))
+    return digests
+
+def _tree_result(mode, leaf_size, size, leaves):
+    return {
+        "mode": mode,
+        "leaf_size": leaf_size,
+        "size": size,
+        "root": tree_root(leaves, mode).hex(),
+        "leaves": [leaf.hex() for leaf in leaves],
+    }
+
+def format_tree_root(result):
+    return f"tree1-{result['mode']}-{result['leaf_size']}:{result['root']}"
+
+def tree_hash(source, mode, leaf_size=TREE_LEAF_SIZE, workers=None, progress=None):
+    # source is a local path (memory-mapped) or anything iter_chunks accepts.
+    # Returns a dict with the root and every leaf digest in hex; see the
+    # format notes above.
+    if mode not in ALGORITHMS:
+        raise ValueError(f"Unsupported mode: {mode}")
+    if isinstance(source, (str, os.PathLike)):
+        size = os.path.getsize(source)
+        count = -(-size // leaf_size)
+        digests = _hash_mapped_leaves(source, mode, leaf_size, range(count), workers, progress)
+        return _tree_result(mode, leaf_size, size, [digests[i] for i in range(count)])
+
+    leaves = []
+    size = 0
+    in_flight = deque()
+    workers = workers or min(32, (os.cpu_count() or 1) + 4)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        limit = 2 * workers
+        for leaf in _iter_leaves(source, leaf_size):
+            size += len(leaf)
+            in_flight.append(pool.submit(_leaf_digest, mode, leaf))
+            if len(in_flight) >= limit:
+                leaves.append(in_flight.popleft().result())
+                if progress:
+                    progress(len(leaves), None)
+        while in_flight:
+            leaves.append(in_flight.popleft().result())
+            if progress:
+                progress(len(leaves), None)
+    return _tree_result(mode, leaf_size, size, leaves)
+
+def update_tree_hash(path, previous, changed=(), mode=None, leaf_size=None, workers=None, progress=None):
+    # Re-hashes only the leaves listed in changed and any leaf that is not
+    # whole in both the old and the new file: the old partial last leaf and
+    # anything appended when the file grew, the new last leaf when it shrank.
+    # mode and leaf_size, when given, must match previous.
+    if mode is not None and mode != previous["mode"]:
+        raise ValueError(f"Previous tree hash used {previous['mode']}, not {mode}")
+    if leaf_size is not None and leaf_size != previous["leaf_size"]:
+        raise ValueError(f"Previous tree hash used {previous['leaf_size']}-byte leaves, not {leaf_size}")
+    mode, leaf_size = previous["mode"], previous["leaf_size"]
+    if mode not in ALGORITHMS:
+        raise ValueError(f"Unsupported mode: {mode}")
+    if len(previous["leaves"]) != -(-previous["size"] // leaf_size):
+        raise ValueError("Previous leaf count does not match its size and leaf size")
+    size = os.path.getsize(path)
+    count = -(-size // leaf_size)
+    old = [bytes.fromhex(leaf) for leaf in previous["leaves"]]
+    reusable = min(size, previous["size"]) // leaf_size
+    changed = set(changed)
+    indices = [i for i in range(count) if i >= reusable or i in changed]
+    digests = _hash_mapped_leaves(path, mode, leaf_size, indices, workers, progress)
+    return _tree_result(mode, leaf_size, size, [digests.get(i, old[i] if i < reusable else None) for i in range(count)])
+
+def format_tree_export(result):
+    lines = [
+        f"# tree1 mode={result['mode']} leaf_size={result['leaf_size']} size={result['size']} leaves={len(result['leaves'])}",
+        f"root {result['root']}",
+    ]
+    lines.extend(result["leaves"])
+    return "\n".join(lines) + "\n"
+
+def parse_tree_export(text):
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    if len(lines) < 2 or not lines[0].startswith("# tree1 ") or not lines[1].startswith("root "):
+        raise ValueError("Not a tree1 leaf export")
+    fields = dict(part.split("=", 1) for part in lines[0][len("# tree1 "):].split(" ") if "=" in part)
+    result = {
+        "mode": fields["mode"],
+        "leaf_size": int(fields["leaf_size"]),
+        "size": int(fields["size"]),
+        "root": lines[1][len("root "):],
+        "leaves": lines[2:],
+    }
+    if len(result["leaves"]) != int(fields["leaves"]):
+        raise ValueError("Leaf count does not match the export header")
+    return result
+
+def _hash_values(mode, salt, values):
+    new = ALGORITHMS[mode]
+    salt = salt.encode("utf-8")
+    return [new(salt + value.encode("utf-8")).hexdigest() for value in values]
+
+def _hash_column(pool, workers, mode, salt, values):
+    if pool is None or len(values) < 2 * workers:
+        return _hash_values(mode, salt, values)
+    step = -(-len(values) // workers)
+    parts = [values[i:i + step] for i in range(0, len(values), step)]
+    return [digest for part in pool.map(_hash_values, repeat(mode), repeat(salt), parts) for digest in part]
+
+def _peak_rss_mb(children=False):
+    # High-water mark of this process (or of its largest finished child)
+    # since it started, not of any one job.
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def hash_table(source, columns, mode, out, output_format="csv", salt="", chunksize=TABLE_CHUNK_ROWS, workers=None, progress=None):
+    # Streams a CSV (path or file object) chunk by chunk, replaces each value
+    # of the chosen columns with hex(H(salt || value)) and writes the chunk to
+    # out as CSV or Parquet. Values are read as strings with NA detection off
+    # so untouched columns round-trip unchanged (a literal "NA" or "null" is
+    # hashed like any other value); only empty cells stay empty. Per-value
+    # hashing holds the GIL, so chunks are split across a process pool when
+    # workers > 1. peak_rss_mb is the process-lifetime high-water mark;
+    # peak_rss_growth_mb is how far this job raised it.
+    if mode not in ALGORITHMS:
+        raise ValueError(f"Unsupported mode: {mode}")
+    if output_format not in ("csv", "parquet"):
+        raise ValueError(f"Unsupported output format: {output_format}")
+    if output_format == "parquet":
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ValueError("Parquet output needs the optional pyarrow package.")
+
+    workers = workers or os.cpu_count() or 1
+    pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+    writer = None
+    rows = 0
+    baseline = _peak_rss_mb()
+    started = time.perf_counter()
+    try:
+        for frame in pd.read_csv(source, dtype=str, keep_default_na=False, chunksize=chunksize):
+            missing = [c for c in columns if c not in frame.columns]
+            if missing:
+                raise ValueError(f"Unknown column(s): {', '.join(missing)}")
+            for column in columns:
+                present = frame[column].notna() & (frame[column] != "")
+                values = frame.loc[present, column].tolist()
+                frame.loc[present, column] = _hash_column(pool, workers, mode, salt, values)
+            if output_format == "csv":
+                frame.to_csv(out, header=rows == 0, index=False)
+            else:
+                table = pa.Table.from_pandas(frame, preserve_index=False)
+                if writer is None:
+                    writer = pq.ParquetWriter(out, pa.schema([(name, pa.string()) for name in frame.columns]))
+                writer.write_table(table.cast(writer.schema))
+            rows += len(frame)
+            if progress:
+                progress(rows)
+    finally:
+        if writer is not None:
+            writer.close()
+        if pool is not None:
+            pool.shutdown()
+    seconds = time.perf_counter() - started
+    peak = _peak_rss_mb()
+    return {
+        "rows": rows,
+        "seconds": seconds,
+        "rows_per_second": rows / seconds if seconds else 0.0,
+        "peak_rss_mb": peak,
+        "peak_rss_growth_mb": peak - baseline if peak is not None else None,
+        "worker_peak_rss_mb": _peak_rss_mb(children=True) if pool is not None else None,
+    }
+
+def open_index(path=INDEX_PATH):
+    # Local content-addressed index of digests seen so far. Digests are stored
+    # as raw bytes; the unique (digest, algorithm, name) index serves lookups
+    # by digest alone or by digest and algorithm.
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS digests (
+            id INTEGER PRIMARY KEY,
+            digest BLOB NOT NULL,
+            algorithm TEXT NOT NULL,
+            size INTEGER,
+            name TEXT NOT NULL,
+            recorded_at REAL NOT NULL
+        )""")
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS digests_lookup ON digests (digest, algorithm, name)")
+    return conn
+
+def record_digests(conn, rows, batch_size=10000):
+    # rows are (digest_hex, algorithm, size, name) tuples; size may be None.
+    # Inserts run in one transaction per batch and skip rows already present.
+    now = time.time()
+    batch = []
+    inserted = 0
+    for digest, algorithm, size, name in rows:
+        batch.append((bytes.fromhex(digest), algorithm, size, name, now))
+        if len(batch) >= batch_size:
+            inserted += _insert_batch(conn, batch)
+            batch = []
+    if batch:
+        inserted += _insert_batch(conn, batch)
+    return inserted
+
+def _insert_batch(conn, batch):
+    with conn:
+        before = conn.total_changes
+        conn.executemany("INSERT OR IGNORE INTO digests (digest, algorithm, size, name, recorded_at) "
+                         "VALUES (?, ?, ?, ?, ?)", batch)
+        return conn.total_changes - before
+
+def lookup_digest(conn, digest, algorithm=None):
+    query = "SELECT algorithm, size, name, recorded_at FROM digests WHERE digest = ?"
+    params = [bytes.fromhex(digest)]
+    if algorithm:
+        query += " AND algorithm = ?"
+        params.append(algorithm)
+    return conn.execute(query + " ORDER BY recorded_at", params).fetchall()
+
+def import_manifest(conn, entries, algorithm, batch_size=10000):
+    return record_digests(conn, ((digest, algorithm, None, name) for digest, name in entries), batch_size)
+
+def index_size(conn):
+    return conn.execute("SELECT COUNT(*) FROM digests").fetchone()[0]
+
+def render_index():
+    with st.expander("🗄️ Digest index"):
+        st.write(f"Stored in `{INDEX_PATH}` (set `HASH_INDEX_PATH` to move it).")
+        if st.button("🔢 Count Recorded Digests"):
+            if os.path.exists(INDEX_PATH):
+                with closing(open_index()) as conn:
+                    st.write(f"Recorded digests: **{index_size(conn)}**")
+            else:
+                st.write("Recorded digests: **0** (nothing recorded yet)")
+
+        manifest_file = st.file_uploader("🧾 Import a sha256sum/md5sum style manifest", key="index_manifest")
+        algorithm = st.selectbox("Manifest algorithm:", list(ALGORITHMS), key="index_algorithm")
+        if st.button("📥 Import Manifest"):
+            if manifest_file is None:
+                st.error("⚠️ Please upload a manifest to import.")
+                return
+            try:
+                entries = parse_manifest(manifest_file.getvalue().decode("utf-8"))
+                with closing(open_index()) as conn:
+                    inserted = import_manifest(conn, entries, algorithm)
+            except (UnicodeDecodeError, ValueError) as e:
+                st.error(f"❌ Could not import manifest: {e}")
+                return
+            st.success(f"✅ Imported {inserted} new of {len(entries)} manifest entries.")
+
+def render_batch(mode, record=False):
+    if mode == ALL_MODES:
+        st.info("Batch mode writes a single-algorithm manifest. Please choose one algorithm.")
+        return
+
+    uploaded_files = st.file_uploader("📂 Upload files to hash", accept_multiple_files=True)
+    manifest_file = st.file_uploader(f"🧾 Optional: upload a {MANIFEST_NAMES[mode]} manifest to verify", key="batch_manifest")
+    fail_fast = st.checkbox("Stop at the first mismatch", value=False)
+
+    col1, col2 = st.columns(2)
+    with col1:
+        run_hash = st.button("🔄 Hash All Files")
+    with col2:
+        run_verify = st.button("✅ Verify Manifest")
+
+    if run_hash:
+        if not uploaded_files:
+            st.error("⚠️ Please upload at least one file.")
+            return
+        bar = st.progress(0.0, text="Hashing files...")
+        entries = hash_many([(f.name, f) for f in uploaded_files], mode,
+                            progress=lambda done, total: bar.progress(done / total, text=f"Hashed {done}/{total} files"))
+        bar.empty()
+        if record:
+            sizes = {f.name: f.size for f in uploaded_files}
+            with closing(open_index()) as conn:
+                record_digests(conn, [(digest, mode, sizes[name], name) for name, digest in entries])
+        st.success(f"✅ Hashed {len(entries)} file(s) using {mode}.")
+        st.dataframe([{"File": name, mode: digest} for name, digest in entries])
+        st.download_button("📥 Download Manifest", data=format_manifest(entries),
+                           file_name=MANIFEST_NAMES[mode], mime="text/plain")
+
+    if run_verify:
+        if manifest_file is None:
+            st.error("⚠️ Please upload a manifest to verify.")
+            return
+        try:
+            entries = parse_manifest(manifest_file.getvalue().decode("utf-8"))
+        except (UnicodeDecodeError, ValueError) as e:
+            st.error(f"❌ Could not read manifest: {e}")
+            return
+        sources = {f.name: f for f in uploaded_files or []}
+        bar = st.progress(0.0, text="Verifying...")
+        results = verify_manifest(entries, mode, sources=sources, fail_fast=fail_fast,
+                                  progress=lambda done, total: bar.progress(done / total, text=f"Checked {done}/{total} files"))
+        bar.empty()
+        bad = [(name, status) for name, status in results if status != "OK"]
+        if bad:
+            st.error(f"❌ {len(bad)} of {len(results)} checked file(s) did not verify.")
+        else:
+            st.success(f"✅ All {len(results)} file(s) verified.")
+        st.dataframe([{"File": name, "Status": status} for name, status in results])
+
+def render_tree(mode):
+    if mode == ALL_MODES:
+        st.info("Tree hashing uses a single algorithm. Please choose one.")
+        return
+
+    uploaded_file = st.file_uploader("📂 Upload a large file to tree-hash")
+    leaf_mib = st.select_slider("🍃 Leaf size (MiB):", options=[1, 2, 4, 8, 16, 32, 64], value=TREE_LEAF_SIZE // (1024 * 1024))
+
+    with st.expander("ℹ️ About tree hashing"):
+        st.markdown("""
+        The file is split into fixed-size **leaves** which are hashed in parallel, then
+        combined pairwise into a single **root** digest (a Merkle tree).
+
+        - `leaf = H(0x00 || leaf bytes)`, `node = H(0x01 || left || right)`
+        - An odd node at the end of a level is carried up unchanged.
+        - The root depends on the algorithm **and** the leaf size, so it is shown as
+          `tree1-<algorithm>-<leaf size>:<root>` and does **not** equal the plain digest.
+
+        Download the leaf digests to later re-hash only changed or appended leaves.
+        """)
+
+    if st.button("🌳 Run Tree Hash"):
+        if uploaded_file is None:
+            st.error("⚠️ Please upload a file.")
+            return
+        uploaded_file.seek(0)
+        leaf_size = leaf_mib * 1024 * 1024
+        total = max(1, -(-uploaded_file.size // leaf_size))
+        bar = st.progress(0.0, text="Hashing leaves...")
+        result = tree_hash(uploaded_file, mode, leaf_size,
+                           progress=lambda done, _: bar.progress(min(done / total, 1.0), text=f"Hashed {done}/{total} leaves"))
+        bar.empty()
+        st.success(f"✅ Tree hash of {uploaded_file.name} ({len(result['leaves'])} leaves):\n\n`{format_tree_root(result)}`")
+        st.download_button("📥 Download Leaf Digests", data=format_tree_export(result),
+                           file_name=f"{uploaded_file.name}.tree1", mime="text/plain")
+
+def render_table(mode):
+    if mode == ALL_MODES:
+        st.info("Column hashing uses a single algorithm. Please choose one.")
+        return
+
+    uploaded_file = st.file_uploader("📂 Upload a CSV file", type=["csv"])
+    if uploaded_file is None:
+        return
+    try:
+        header = pd.read_csv(uploaded_file, nrows=0, dtype=str, keep_default_na=False).columns.tolist()
+    except (ValueError, pd.errors.ParserError) as e:
+        st.error(f"❌ Could not read CSV header: {e}")
+        return
+
+    columns = st.multiselect("🧮 Columns to hash:", header)
+    salt = st.text_input("🧂 Optional salt (prepended to every value):", type="password")
+    output_format = st.radio("📤 Output format:", ["CSV", "Parquet"], horizontal=True)
+
+    if st.button("🔄 Hash Columns"):
+        if not columns:
+            st.error("⚠️ Please choose at least one column.")
+            return
+        uploaded_file.seek(0)
+        status = st.empty()
+        fmt = output_format.lower()
+        out = tempfile.TemporaryFile(mode="w+b") if fmt == "parquet" else tempfile.TemporaryFile(mode="w+", encoding="utf-8", newline="")
+        with out:
+            try:
+                stats = hash_table(uploaded_file, columns, mode, out, fmt, salt,
+                                   progress=lambda rows: status.write(f"⏳ Hashed {rows:,} rows..."))
+            except ValueError as e:
+                status.empty()
+                st.error(f"❌ {e}")
+                return
+            status.empty()
+            out.seek(0)
+            data = out.read()
+
+        st.success(f"✅ Hashed {len(columns)} column(s) of {stats['rows']:,} rows using {mode}.")
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Rows / second", f"{stats['rows_per_second']:,.0f}")
+        col2.metric("Time", f"{stats['seconds']:.2f} s")
+        if stats["peak_rss_mb"] is None:
+            col3.metric("Server peak memory", "n/a")
+        else:
+            workers_note = (f" Worker processes peaked at {stats['worker_peak_rss_mb']:.0f} MB."
+                            if stats["worker_peak_rss_mb"] else "")
+            col3.metric("Server peak memory", f"{stats['peak_rss_mb']:.0f} MB",
+                        delta=f"+{stats['peak_rss_growth_mb']:.0f} MB this job", delta_color="off",
+                        help="High-water mark of the whole Streamlit process since it started, so earlier "
+                             "jobs count too; the delta is how far this job raised it." + workers_note)
+        name = os.path.splitext(uploaded_file.name)[0]
+        st.download_button("📥 Download Hashed Table", data=data, file_name=f"{name}_hashed.{fmt}",
+                           mime="text/csv" if fmt == "csv" else "application/octet-stream")
 
 def render():
     st.title("🔐 Hashing Algorithms")
@@ -56,28 +795,133 @@ def render():
             Hashing ensures that even a tiny change in input data produces a drastically different hash, making it ideal for detecting tampering and verifying authenticity.
             """)
 
-    mode = st.radio("🔢 Choose hashing algorithm:", ["SHA-256", "MD5", "SHA-3(256)", "RIPEMD(160)"])
+    mode = st.radio("🔢 Choose hashing algorithm:", ["SHA-256", "MD5", "SHA-3(256)", "RIPEMD(160)", ALL_MODES])
     
-    input_type = st.radio("📥 Select input type:", ["Text", "File"])
+    input_type = st.radio("📥 Select input type:", ["Text", "File", "Batch", "Tree", "Table (CSV)"])
 
-    data = None
-    if input_type == "Text":
-        text = st.text_area("📝 Enter text:")
-        if text.strip():
-            data = text.encode('utf-8')
-    else:
-        uploaded_file = st.file_uploader("📂 Upload a file to hash")
-        if uploaded_file:
-            data = uploaded_file.read()
+    record = st.checkbox("🗄️ Record digests in the local digest index", value=False)
 
-    if st.button("🔄 Run Hash Function"):
-        if data is None:
-            st.error("⚠️ Please provide input (text or file).")
+    if input_type == "Batch":
+        render_batch(mode, record)
+    elif input_type == "Tree":
+        render_tree(mode)
+    elif input_type == "Table (CSV)":
+        render_table(mode)
+    else:
+        data = None
+        if input_type == "Text":
+            text = st.text_area("📝 Enter text:")
+            if text.strip():
+                data = text.encode('utf-8')
         else:
-            result = hashing(data, mode)
+            uploaded_file = st.file_uploader("📂 Upload a file to hash")
+            if uploaded_file:
+                data = uploaded_file
+
+        cache = st.session_state.setdefault("digest_cache", DigestCache())
+        key = (fingerprint(data), mode) if data is not None else None
+
+        result = None
+        from_cache = False
+        if st.button("🔄 Run Hash Function"):
+            if data is None:
+                st.error("⚠️ Please provide input (text or file).")
+            else:
+                result = cache.get(key)
+                from_cache = result is not None
+                if result is None:
+                    progress = None
+                    if input_type == "File":
+                        uploaded_file.seek(0)
+                        total = uploaded_file.size or 1
+                        bar = st.progress(0.0, text="Hashing...")
+                        progress = lambda done: bar.progress(min(done / total, 1.0), text="Hashing...")
+                    result = hashing(data, mode, progress)
+                    if input_type == "File":
+                        bar.empty()
+                    cache.put(key, result)
+                    if isinstance(result, dict):
+                        for name, digest in result.items():
+                            cache.put((key[0], name), digest)
+                # Cached results are recorded too; the index skips duplicates.
+                if record:
+                    size = uploaded_file.size if input_type == "File" else len(data)
+                    label = uploaded_file.name if input_type == "File" else "(text)"
+                    digests = result.items() if isinstance(result, dict) else [(mode, result)]
+                    with closing(open_index()) as conn:
+                        record_digests(conn, [(digest, name, size, label) for name, digest in digests])
+        elif key is not None:
+            result = cache.peek(key)
+            from_cache = result is not None
+
+        if result is not None:
             label = uploaded_file.name if input_type == "File" and uploaded_file else "entered text"
-            st.success(f"✅ Hash of {label} using {mode}:\n\n`{result}`")
-            
+            note = " (cached)" if from_cache else ""
+            if isinstance(result, dict):
+                lines = "\n\n".join(f"**{name}:** `{digest}`" for name, digest in result.items())
+                st.success(f"✅ Hashes of {label} (single pass){note}:\n\n{lines}")
+            else:
+                st.success(f"✅ Hash of {label} using {mode}{note}:\n\n`{result}`")
+
+            if st.button("🔎 Check Against Index"):
+                digests = result.items() if isinstance(result, dict) else [(mode, result)]
+                matches = []
+                if os.path.exists(INDEX_PATH):
+                    with closing(open_index()) as conn:
+                        matches = [{"Algorithm": algorithm, "Name": name, "Size": size,
+                                    "Recorded": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(recorded_at))}
+                                   for mode_name, digest in digests
+                                   for algorithm, size, name, recorded_at in lookup_digest(conn, digest, mode_name)]
+                if matches:
+                    st.info(f"🔁 Seen before: {len(matches)} matching record(s) in the index.")
+                    st.dataframe(matches)
+                else:
+                    st.info("🆕 Not in the index yet.")
+
+        st.caption(f"🗃️ Digest cache: {cache.hits} hits · {cache.misses} misses · "
+                   f"{len(cache.entries)} entries ({cache.total_bytes} bytes)")
+
+    render_index()
+
     if st.button("⬅️ Back to Main Menu"):
         st.session_state.page = "Main Menu"
-        st.rerun()
\ No newline at end of file
+        st.rerun()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Hash a directory into a sha256sum/md5sum style manifest, or verify one.")
+    parser.add_argument("path", help="directory to hash, or manifest file to verify with --check")
+    parser.add_argument("-a", "--algorithm", default="SHA-256", choices=list(ALGORITHMS))
+    parser.add_argument("-o", "--output", help="write the manifest to this file instead of stdout")
+    parser.add_argument("-c", "--check", action="store_true", help="verify a manifest; names are resolved relative to its directory")
+    parser.add_argument("--fail-fast", action="store_true", help="stop verifying at the first mismatch")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="number of hashing threads")
+    parser.add_argument("--index", metavar="DB", help="also record the hashed files in this SQLite digest index")
+    args = parser.parse_args(argv)
+
+    if args.check:
+        with open(args.path, encoding="utf-8") as f:
+            entries = parse_manifest(f.read())
+        root = os.path.dirname(os.path.abspath(args.path))
+        results = verify_manifest(entries, args.algorithm, root=root, workers=args.workers, fail_fast=args.fail_fast)
+        for name, status in results:
+            print(f"{name}: {status}")
+        failed = sum(status != "OK" for _, status in results)
+        if failed or len(results) != len(entries):
+            print(f"WARNING: {failed} file(s) did not verify", file=sys.stderr)
+            return 1
+        return 0
+
+    exclude = [args.output] if args.output else []
+    entries = hash_directory(args.path, args.algorithm, workers=args.workers, exclude=exclude)
+    if args.index:
+        with closing(open_index(args.index)) as conn:
+            record_digests(conn, [(digest, args.algorithm, os.path.getsize(os.path.join(args.path, name)), name)
+                                  for name, digest in entries])
+    if args.output:
+        write_manifest(entries, args.output)
+    else:
+        sys.stdout.write(format_manifest(entries))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
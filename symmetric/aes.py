@@ -2,6 +2,225 @@ import streamlit as st
 from Crypto.Cipher import AES
 from Crypto.Util.Padding import pad, unpad
 import base64
+import io
+import os
+import tempfile
+import time
+from functools import partial
+from symmetric.parallel import WORKERS, iter_file_chunks, ordered_map, read_exact, transform_stream, with_final
+
+# Multiple of both the AES block size and the 3-byte base64 group.
+CHUNK_SIZE = 1024 * 1024 - 1024 * 1024 % 48
+WHITESPACE = b" \t\r\n"
+
+CONTAINER_MAGIC = b"AESC"
+CONTAINER_VERSION = 1
+CONTAINER_HEADER = 16
+CONTAINER_CHUNK = 64 * 1024
+TAG_SIZE = 16
+
+def base64_decode_chunks(chunks):
+    # Decodes a base64 stream chunk by chunk, ignoring whitespace and
+    # carrying incomplete 4-character groups into the next chunk.
+    carry = b""
+    for chunk in chunks:
+        data = carry + chunk.translate(None, WHITESPACE)
+        cut = len(data) - len(data) % 4
+        carry = data[cut:]
+        if cut:
+            yield base64.b64decode(data[:cut], validate=True)
+    if carry:
+        raise ValueError("Base64 input is truncated.")
+
+class Base64Writer:
+    # File-like wrapper that base64-encodes everything written through it,
+    # carrying incomplete 3-byte groups until close().
+    def __init__(self, dst):
+        self.dst = dst
+        self.carry = b""
+
+    def write(self, data):
+        data = self.carry + bytes(data)
+        cut = len(data) - len(data) % 3
+        self.carry = data[cut:]
+        self.dst.write(base64.b64encode(data[:cut]))
+
+    def close(self):
+        self.dst.write(base64.b64encode(self.carry))
+        self.carry = b""
+
+class Base64Reader:
+    # File-like wrapper that base64-decodes src as it is read.
+    def __init__(self, src, chunk_size=CHUNK_SIZE):
+        self.chunks = base64_decode_chunks(iter_file_chunks(src, chunk_size))
+        self.buffer = b""
+
+    def read(self, size):
+        while len(self.buffer) < size:
+            chunk = next(self.chunks, None)
+            if chunk is None:
+                break
+            self.buffer += chunk
+        data, self.buffer = self.buffer[:size], self.buffer[size:]
+        return data
+
+def ecb_chunk(data, position, final, key, decrypt=False):
+    # Chunk function for the parallel executor: ECB blocks are independent,
+    # so only the final chunk needs padding (or unpadding).
+    cipher = AES.new(key, AES.MODE_ECB)
+    if not decrypt:
+        return cipher.encrypt(pad(data, AES.block_size) if final else data)
+    if len(data) % AES.block_size or final and not data:
+        raise ValueError("Ciphertext length is not a multiple of the block size.")
+    plain = cipher.decrypt(data)
+    return unpad(plain, AES.block_size) if final else plain
+
+def aes_encrypt_stream(src, dst, key, encoding="binary", chunk_size=CHUNK_SIZE, workers=WORKERS):
+    # Encrypts a binary file object chunk by chunk; only the final partial
+    # block is padded. Peak memory is a few chunks whatever the size.
+    out = Base64Writer(dst) if encoding == "base64" else dst
+    read, _ = transform_stream(src, out, partial(ecb_chunk, key=key), chunk_size, workers=workers)
+    if encoding == "base64":
+        out.close()
+    return read
+
+def aes_decrypt_stream(src, dst, key, encoding="binary", chunk_size=CHUNK_SIZE, workers=WORKERS):
+    # Decrypts a binary or base64 file object chunk by chunk; padding is
+    # checked and stripped on the final chunk only.
+    if encoding == "base64":
+        src = Base64Reader(src, chunk_size)
+    _, written = transform_stream(src, dst, partial(ecb_chunk, key=key, decrypt=True), chunk_size, workers=workers)
+    return written
+
+# Seekable container format (version 1)
+#
+#   header  = "AESC" || version (1 byte) || chunk_size (uint32 LE) || prefix (7 random bytes)
+#   chunk_i = AES-GCM(key, nonce_i, aad=header).encrypt(plain_i) || tag_i (16 bytes)
+#   nonce_i = prefix || i (uint32 BE) || final (1 byte, 1 on the last chunk)
+#
+# Every chunk holds chunk_size plaintext bytes except the last, which holds
+# the rest (possibly zero). Chunk i therefore starts at a fixed file offset
+# and any byte range can be decrypted from the chunks that cover it. The
+# index in the nonce stops chunks being reordered, the final flag (as in the
+# STREAM construction) makes truncation at a chunk boundary fail
+# authentication, and the header is authenticated with every chunk.
+
+def _chunk_cipher(key, header, index, final):
+    cipher = AES.new(key, AES.MODE_GCM, nonce=header[-7:] + index.to_bytes(4, "big") + bytes([final]))
+    cipher.update(header)
+    return cipher
+
+def _seal_chunk(key, header, index, final, data):
+    ciphertext, tag = _chunk_cipher(key, header, index, final).encrypt_and_digest(data)
+    return ciphertext + tag
+
+def _open_chunk(key, header, index, final, blob):
+    if len(blob) < TAG_SIZE:
+        raise ValueError(f"Chunk {index} is truncated.")
+    try:
+        return _chunk_cipher(key, header, index, final).decrypt_and_verify(blob[:-TAG_SIZE], blob[-TAG_SIZE:])
+    except ValueError:
+        raise ValueError(f"Chunk {index} failed authentication (wrong key, tampered or truncated file).") from None
+
+def _container_header(chunk_size):
+    return CONTAINER_MAGIC + bytes([CONTAINER_VERSION]) + chunk_size.to_bytes(4, "little") + os.urandom(7)
+
+def _parse_container_header(header):
+    if len(header) != CONTAINER_HEADER or header[:4] != CONTAINER_MAGIC:
+        raise ValueError("Not an AES container file.")
+    if header[4] != CONTAINER_VERSION:
+        raise ValueError(f"Unsupported container version {header[4]}.")
+    chunk_size = int.from_bytes(header[5:9], "little")
+    if not chunk_size:
+        raise ValueError("Container chunk size is zero.")
+    return chunk_size
+
+def container_encrypt(src, dst, key, chunk_size=CONTAINER_CHUNK, workers=WORKERS):
+    # Writes src into dst as a seekable container, sealing chunks in parallel.
+    header = _container_header(chunk_size)
+    dst.write(header)
+    chunks = with_final(iter_file_chunks(src, chunk_size))
+    items = ((index, final, chunk) for index, (chunk, final) in enumerate(chunks))
+    total = 0
+    for blob in ordered_map(lambda index, final, chunk: _seal_chunk(key, header, index, final, chunk), items, workers):
+        dst.write(blob)
+        total += len(blob) - TAG_SIZE
+    return total
+
+def container_decrypt(src, dst, key, workers=WORKERS):
+    # Decrypts and verifies a whole container sequentially from a stream.
+    header = read_exact(src, CONTAINER_HEADER)
+    stride = _parse_container_header(header) + TAG_SIZE
+    blobs = with_final(iter_file_chunks(src, stride))
+    items = ((index, final, blob) for index, (blob, final) in enumerate(blobs))
+    total = 0
+    for plain in ordered_map(lambda index, final, blob: _open_chunk(key, header, index, final, blob), items, workers):
+        dst.write(plain)
+        total += len(plain)
+    return total
+
+class ContainerReader:
+    # Random access into a container on a seekable binary file object.
+    # read(offset, length) only reads and verifies the chunks covering the
+    # range, decrypting them on a thread pool when there are several.
+    def __init__(self, f, key, workers=WORKERS):
+        self.f = f
+        self.key = key
+        self.workers = workers
+        f.seek(0)
+        self.header = read_exact(f, CONTAINER_HEADER)
+        self.chunk_size = _parse_container_header(self.header)
+        self.stride = self.chunk_size + TAG_SIZE
+        body = f.seek(0, os.SEEK_END) - CONTAINER_HEADER
+        self.chunks = max(1, -(-body // self.stride))
+        last = body - (self.chunks - 1) * self.stride - TAG_SIZE
+        if last < 0:
+            raise ValueError("Container is truncated.")
+        self.length = (self.chunks - 1) * self.chunk_size + last
+
+    def read_chunk(self, index):
+        return self.read_chunks(index, index + 1)
+
+    def read_chunks(self, first, last):
+        # Plaintext of chunks first..last-1, read with a single seek.
+        self.f.seek(CONTAINER_HEADER + first * self.stride)
+        data = read_exact(self.f, (last - first) * self.stride)
+        items = [(index, index == self.chunks - 1, data[(index - first) * self.stride:(index - first + 1) * self.stride])
+                 for index in range(first, last)]
+        open_chunk = lambda index, final, blob: _open_chunk(self.key, self.header, index, final, blob)
+        return b"".join(ordered_map(open_chunk, items, min(self.workers, len(items))))
+
+    def read(self, offset, length):
+        offset = max(0, min(offset, self.length))
+        length = max(0, min(length, self.length - offset))
+        if not length:
+            return b""
+        first = offset // self.chunk_size
+        last = (offset + length - 1) // self.chunk_size + 1
+        skip = offset - first * self.chunk_size
+        return self.read_chunks(first, last)[skip:skip + length]
+
+def benchmark_container(size=64 * 1024 * 1024, chunk_size=CONTAINER_CHUNK, range_length=4096, reads=100):
+    # Seconds per range read vs one full decrypt of a size-byte container.
+    key = os.urandom(32)
+    with tempfile.TemporaryFile() as plain, tempfile.TemporaryFile() as sealed:
+        for _ in range(0, size, CHUNK_SIZE):
+            plain.write(os.urandom(min(CHUNK_SIZE, size - plain.tell())))
+        plain.seek(0)
+        start = time.perf_counter()
+        container_encrypt(plain, sealed, key, chunk_size)
+        encrypt = time.perf_counter() - start
+        sealed.seek(0)
+        start = time.perf_counter()
+        container_decrypt(sealed, io.BytesIO() if size <= 256 * 1024 * 1024 else tempfile.TemporaryFile(), key)
+        full = time.perf_counter() - start
+        reader = ContainerReader(sealed, key)
+        offsets = [int.from_bytes(os.urandom(8), "little") % max(1, size - range_length) for _ in range(reads)]
+        start = time.perf_counter()
+        for offset in offsets:
+            reader.read(offset, range_length)
+        ranged = (time.perf_counter() - start) / reads
+    return {"encrypt": encrypt, "full_decrypt": full, "range_read": ranged}
 
 def render():
     st.title("🔐 AES (ECB Mode)")
@@ -56,7 +275,8 @@ def render():
     input_type = st.radio("Input Type:", ["Text", "File"])
 
     data = None
-    filename = None
+    uploaded_file = None
+    encoding = "base64"
 
     if input_type == "Text":
         text = st.text_area("Enter text:")
@@ -64,9 +284,19 @@ def render():
             data = text.encode()
     else:
         uploaded_file = st.file_uploader("Upload file:")
-        if uploaded_file:
-            data = uploaded_file.read()
-            filename = uploaded_file.name
+        file_format = st.radio("File format:", ["ECB", "Seekable container (GCM)"], horizontal=True)
+        if file_format == "ECB":
+            label = "Output encoding:" if mode == "Encrypt" else "Ciphertext encoding:"
+            encoding = st.radio(label, ["Binary", "Base64"], horizontal=True).lower()
+        else:
+            encoding = "container"
+            st.caption("Chunks of 64 KiB are sealed with AES-GCM, so any byte range can be decrypted "
+                       "and verified without touching the rest of the file.")
+            if mode == "Decrypt" and st.checkbox("Decrypt a byte range only"):
+                range_offset = st.number_input("Range offset (bytes):", min_value=0, value=0)
+                range_length = st.number_input("Range length (bytes):", min_value=1, value=4096)
+            else:
+                range_offset = None
 
     key_size = st.selectbox("Select key size (bits):", [128, 192, 256])
     key_length = key_size // 8 
@@ -81,30 +311,72 @@ def render():
     if st.button("🚀 Run"):
         if not key_valid:
             st.error("Invalid key length.")
-        elif not data:
+        elif not data and (uploaded_file is None or not uploaded_file.size):
             st.error("Please provide input data (text or file).")
-        else:
-            cipher = AES.new(key, AES.MODE_ECB)
-
+        elif uploaded_file is None:
+            out = io.BytesIO()
+            # Threads only pay off from 8 MiB up.
+            workers = WORKERS if len(data) > 8 * 1024 * 1024 else 1
             if mode == "Encrypt":
-                padded = pad(data, AES.block_size)
-                ciphertext = cipher.encrypt(padded)
-                b64_cipher = base64.b64encode(ciphertext).decode()
+                aes_encrypt_stream(io.BytesIO(data), out, key, "base64", workers=workers)
                 st.success("✅ Encrypted!")
-                st.text_area("Ciphertext (Base64):", value=b64_cipher, height=150)
+                st.text_area("Ciphertext (Base64):", value=out.getvalue().decode(), height=150)
             else:
                 try:
-                    decoded = base64.b64decode(data)
-                    decrypted = unpad(cipher.decrypt(decoded), AES.block_size)
-                    if input_type == "Text":
-                        st.success("✅ Decrypted!")
-                        st.text_area("Plaintext:", value=decrypted.decode(), height=150)
-                    else:
-                        st.download_button("📥 Download Decrypted File", data=decrypted, file_name=f"decrypted_{filename}")
+                    aes_decrypt_stream(io.BytesIO(data), out, key, "base64", workers=workers)
+                    st.success("✅ Decrypted!")
+                    st.text_area("Plaintext:", value=out.getvalue().decode(), height=150)
                 except Exception as e:
                     st.error(f"❌ Decryption failed: {e}")
+        elif encoding == "container" and mode == "Decrypt" and range_offset is not None:
+            try:
+                reader = ContainerReader(uploaded_file, key)
+                start = time.perf_counter()
+                chunk = reader.read(int(range_offset), int(range_length))
+                elapsed = time.perf_counter() - start
+            except Exception as e:
+                st.error(f"❌ Decryption failed: {e}")
+            else:
+                st.success(f"✅ Verified and decrypted {len(chunk):,} of {reader.length:,} bytes "
+                           f"in {elapsed * 1000:.1f} ms.")
+                st.text_area("Range (preview):", value=chunk[:5000].decode("utf-8", errors="replace"), height=150)
+                st.download_button("📥 Download Range", data=chunk, file_name=f"range_{uploaded_file.name}",
+                                   mime="application/octet-stream")
+        else:
+            uploaded_file.seek(0)
+            workers = WORKERS if uploaded_file.size > 8 * 1024 * 1024 else 1
+            with tempfile.SpooledTemporaryFile(max_size=64 * CHUNK_SIZE) as out:
+                try:
+                    if encoding == "container":
+                        if mode == "Encrypt":
+                            container_encrypt(uploaded_file, out, key, workers=workers)
+                            name = f"{uploaded_file.name}.aesc"
+                        else:
+                            container_decrypt(uploaded_file, out, key, workers=workers)
+                            name = f"decrypted_{uploaded_file.name}"
+                    elif mode == "Encrypt":
+                        aes_encrypt_stream(uploaded_file, out, key, encoding, workers=workers)
+                        name = f"{uploaded_file.name}.aes" + (".b64" if encoding == "base64" else "")
+                    else:
+                        aes_decrypt_stream(uploaded_file, out, key, encoding, workers=workers)
+                        name = f"decrypted_{uploaded_file.name}"
+                except Exception as e:
+                    st.error(f"❌ {mode}ion failed: {e}")
+                else:
+                    st.success(f"✅ {mode}ed {uploaded_file.size:,} bytes into {out.tell():,} bytes.")
+                    out.seek(0)
+                    st.download_button(f"📥 Download {mode}ed File", data=out.read(), file_name=name,
+                                       mime="application/octet-stream")
 
     st.markdown("---")            
     if st.button("⬅️ Back to Symmetric Algorithms"):
         st.session_state.sym_page = "menu"
         st.rerun()
+
+if __name__ == "__main__":
+    size = 64 * 1024 * 1024
+    timings = benchmark_container(size)
+    print(f"container encrypt {size / timings['encrypt'] / 1e6:.0f} MB/s, "
+          f"full decrypt {timings['full_decrypt'] * 1000:.0f} ms, "
+          f"4 KiB range read {timings['range_read'] * 1000:.2f} ms "
+          f"({timings['full_decrypt'] / timings['range_read']:.0f}x faster)")
@@ -1,15 +1,91 @@
 import streamlit as st
+import numpy as np
+import functools
+import string
+import tempfile
+from symmetric.parallel import transform_stream
+
+CHUNK_SIZE = 1024 * 1024
+PREVIEW_BYTES = 5000
+
+# Relative letter frequencies of English text, A to Z.
+ENGLISH_FREQ = np.array([
+    0.08167, 0.01492, 0.02782, 0.04253, 0.12702, 0.02228, 0.02015, 0.06094, 0.06966,
+    0.00153, 0.00772, 0.04025, 0.02406, 0.06749, 0.07507, 0.01929, 0.00095, 0.05987,
+    0.06327, 0.09056, 0.02758, 0.00978, 0.02360, 0.00150, 0.01974, 0.00074,
+])
+
+@functools.lru_cache(maxsize=26)
+def shift_table(shift):
+    # 256-byte translation table rotating ASCII letters by shift positions.
+    shift %= 26
+    lower, upper = string.ascii_lowercase, string.ascii_uppercase
+    return bytes.maketrans((lower + upper).encode(),
+                           (lower[shift:] + lower[:shift] + upper[shift:] + upper[:shift]).encode())
+
+def _table(key, mode):
+    return shift_table(key if mode == "encrypt" else -key)
 
 def caesar_cipher(text, key, mode="encrypt"):
-    result = ""
-    for char in text:
-        if char.isalpha():
-            base = ord('A') if char.isupper() else ord('a')
-            shift = key if mode == "encrypt" else -key
-            result += chr((ord(char) - base + shift) % 26 + base)
-        else:
-            result += char
-    return result
+    # Only ASCII letters are shifted. Text goes through UTF-8 so the table
+    # lookup runs in bytes.translate; multi-byte sequences never touch the
+    # ASCII range and come back unchanged.
+    table = _table(key, mode)
+    if isinstance(text, (bytes, bytearray)):
+        return text.translate(table)
+    return text.encode("utf-8", "surrogatepass").translate(table).decode("utf-8", "surrogatepass")
+
+def caesar_chunk(data, position, final, key, mode="encrypt"):
+    return data.translate(_table(key, mode))
+
+def caesar_stream(src, dst, key, mode="encrypt", chunk_size=CHUNK_SIZE):
+    # Encrypts or decrypts a binary file object into another one chunk by
+    # chunk. Works on UTF-8 (or any ASCII-compatible) files without decoding.
+    # Runs inline: bytes.translate is faster than handing a chunk to another
+    # process.
+    read, _ = transform_stream(src, dst, functools.partial(caesar_chunk, key=key, mode=mode),
+                               chunk_size, workers=1)
+    return read
+
+def letter_counts(data):
+    # Case-folded A-Z histogram of a byte string. OR-ing with 0x20 maps
+    # A-Z onto a-z and leaves every other byte outside that range.
+    counts = np.bincount(np.frombuffer(data, dtype=np.uint8) | 0x20, minlength=256)
+    return counts[ord('a'):ord('z') + 1]
+
+def stream_letter_counts(src, chunk_size=CHUNK_SIZE):
+    counts = np.zeros(26, dtype=np.int64)
+    while True:
+        chunk = src.read(chunk_size)
+        if not chunk:
+            break
+        counts += letter_counts(chunk)
+    return counts
+
+def shift_scores(counts):
+    # Chi-squared of every shift against English from a single histogram:
+    # decrypting with shift s turns plaintext letter i into ciphertext
+    # letter (i + s) % 26, so row s of the rolled matrix is the candidate
+    # plaintext histogram. Returns 26 scores indexed by shift.
+    counts = np.asarray(counts, dtype=np.float64)
+    expected = counts.sum() * ENGLISH_FREQ
+    rolled = counts[(np.arange(26)[:, None] + np.arange(26)[None, :]) % 26]
+    return ((rolled - expected) ** 2 / expected).sum(axis=1)
+
+def rank_shifts(counts):
+    # Returns [(shift, chi2), ...] for shifts 1-25, best first. Raises
+    # ValueError when there are no letters to score.
+    if not np.sum(counts):
+        raise ValueError("No letters found to analyse.")
+    chi2 = shift_scores(counts)
+    return [(int(shift), float(chi2[shift])) for shift in np.argsort(chi2) if shift != 0]
+
+def crack_caesar(text):
+    # Returns (best_shift, plaintext, ranking) for a str or bytes ciphertext.
+    data = text if isinstance(text, (bytes, bytearray)) else text.encode("utf-8", "surrogatepass")
+    ranking = rank_shifts(letter_counts(data))
+    best = ranking[0][0]
+    return best, caesar_cipher(text, best, "decrypt"), ranking
 
 def render():
     st.title("🔐 Caesar Cipher")
@@ -56,40 +132,83 @@ def render():
         """)
 
 
-    mode = st.radio("Choose mode:", ["Encrypt", "Decrypt"])
+    mode = st.radio("Choose mode:", ["Encrypt", "Decrypt", "Crack"])
     input_type = st.radio("Input type:", ["Text", "File"])
 
     text = ""
     filename = None
+    uploaded_file = None
 
     if input_type == "Text":
         text = st.text_input("Enter the text:")
     else:
         uploaded_file = st.file_uploader("Upload a .txt file", type=["txt"])
         if uploaded_file:
-            text = uploaded_file.read().decode("utf-8")
             filename = uploaded_file.name
 
-    key = st.number_input("Enter the key (1–25):", min_value=1, max_value=25, value=3)
+    key = None
+    if mode == "Crack":
+        st.caption("The key is recovered by scoring all 25 shifts against English letter frequencies.")
+    else:
+        key = st.number_input("Enter the key (1–25):", min_value=1, max_value=25, value=3)
 
     if st.button("Run Caesar Cipher"):
-        if not text.strip():
+        op = mode.lower()
+        if mode == "Crack":
+            sample = b""
+            counts = None
+            if input_type == "File" and uploaded_file is not None and uploaded_file.size:
+                uploaded_file.seek(0)
+                sample = uploaded_file.read(PREVIEW_BYTES)
+                uploaded_file.seek(0)
+                counts = stream_letter_counts(uploaded_file)
+            elif input_type == "Text" and text.strip():
+                sample = text.encode("utf-8", "surrogatepass")
+                counts = letter_counts(sample)
+            if counts is not None and counts.sum():
+                ranking = rank_shifts(counts)
+                op, key = "decrypt", ranking[0][0]
+                st.info(f"🔎 Most likely key: **{key}**")
+                st.dataframe([
+                    {"Key": shift, "Chi-squared": round(score, 2),
+                     "Preview": caesar_cipher(sample[:60], shift, "decrypt").decode("utf-8", errors="replace")}
+                    for shift, score in ranking[:5]
+                ], hide_index=True)
+            elif counts is not None:
+                st.error("No letters found to analyse.")
+
+        if key is None:
+            if input_type == "Text" and not text.strip() or input_type == "File" and (uploaded_file is None or not uploaded_file.size):
+                st.error("Please enter some text or upload a file.")
+        elif input_type == "File":
+            if uploaded_file is None or not uploaded_file.size:
+                st.error("Please enter some text or upload a file.")
+            else:
+                uploaded_file.seek(0)
+                with tempfile.SpooledTemporaryFile(max_size=64 * CHUNK_SIZE) as out:
+                    caesar_stream(uploaded_file, out, key, op)
+                    out.seek(0)
+                    preview = out.read(PREVIEW_BYTES).decode("utf-8", errors="replace")
+                    out.seek(0)
+                    st.success("✅ Operation successful!")
+                    st.text_area("Result (preview):", value=preview, height=200)
+                    st.download_button(
+                        label="📥 Download Result",
+                        data=out.read(),
+                        file_name=f"{op}ed_{filename or 'output.txt'}",
+                        mime="text/plain"
+                    )
+                if any(not c.isalpha() and not c.isspace() for c in preview):
+                    st.info("Note: Non-letter characters (e.g., punctuation, numbers) were left unchanged.")
+        elif not text.strip():
             st.error("Please enter some text or upload a file.")
-        elif input_type == "Text" and text.isnumeric():
+        elif text.isnumeric():
             st.warning("Input must be a string, not a number.")
         else:
-            result = caesar_cipher(text, key, mode.lower())
+            result = caesar_cipher(text, key, op)
             st.success("✅ Operation successful!")
             st.text_area("Result:", value=result, height=200)
 
-            if input_type == "File":
-                st.download_button(
-                    label="📥 Download Result",
-                    data=result.encode(),
-                    file_name=f"{mode.lower()}ed_{filename or 'output.txt'}",
-                    mime="text/plain"
-                )
-
             if any(not c.isalpha() and not c.isspace() for c in text):
                 st.info("Note: Non-letter characters (e.g., punctuation, numbers) were left unchanged.")
 
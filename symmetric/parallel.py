@@ -0,0 +1,110 @@
+import numpy as np
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# Shared chunk-parallel executor for position-addressable ciphers.
+#
+# A cipher plugs in a chunk function fn(data, position, final) -> bytes that
+# can process any chunk on its own given where the chunk starts: AES-ECB
+# needs nothing (chunks are block aligned), Caesar needs nothing, Vigenère
+# needs the key offset in characters and Vernam the pad offset in digits.
+# position is the byte (or array element) offset of the chunk unless an
+# advance(data, position) function is given, which runs in order on the
+# reading thread and returns the position of the next chunk. final is True
+# for the last chunk only, which is also the only one that may be short
+# (an empty input produces a single empty final chunk).
+#
+# Chunks go to a thread pool (for work that releases the GIL, like
+# pycryptodome and large NumPy operations) or a process pool (for pure
+# Python or bytes.translate work; fn must then be picklable, e.g. a
+# module-level function wrapped in functools.partial). At most
+# max_in_flight chunks are queued at once and results are written in input
+# order, so memory stays around max_in_flight * chunk_size.
+
+CHUNK_SIZE = 1024 * 1024
+WORKERS = os.cpu_count() or 1
+
+def ordered_map(fn, items, workers=WORKERS, processes=False, max_in_flight=None):
+    # Calls fn(*item) for every item on a pool and yields the results in
+    # input order with a bounded number of pending calls. A single worker
+    # runs everything inline.
+    if workers <= 1:
+        for item in items:
+            yield fn(*item)
+        return
+    max_in_flight = max_in_flight or 2 * workers
+    pool = (ProcessPoolExecutor if processes else ThreadPoolExecutor)(max_workers=workers)
+    pending = deque()
+    try:
+        for item in items:
+            pending.append(pool.submit(fn, *item))
+            if len(pending) >= max_in_flight:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+def read_exact(src, size):
+    # Reads size bytes unless the stream ends first, so every chunk but the
+    # last keeps its alignment even on streams that return short reads.
+    data = src.read(size)
+    while data and len(data) < size:
+        more = src.read(size - len(data))
+        if not more:
+            break
+        data += more
+    return data
+
+def with_final(chunks):
+    # Pairs each chunk with whether it is the last one; no chunks at all
+    # becomes a single empty final chunk.
+    current = next(chunks, None)
+    if current is None:
+        current = b""
+    for chunk in chunks:
+        yield current, False
+        current = chunk
+    yield current, True
+
+def _positioned(chunks, start, advance):
+    position = start
+    for data, final in with_final(chunks):
+        yield data, position, final
+        position = advance(data, position) if advance else position + len(data)
+
+def iter_file_chunks(src, chunk_size=CHUNK_SIZE):
+    while True:
+        chunk = read_exact(src, chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+def transform_stream(src, dst, fn, chunk_size=CHUNK_SIZE, start=0, advance=None,
+                     workers=WORKERS, processes=False, max_in_flight=None, progress=None):
+    # Runs fn over a binary file object chunk by chunk and writes the results
+    # to dst in order. Returns (bytes read, bytes written).
+    sizes = deque()
+    def items():
+        for data, position, final in _positioned(iter_file_chunks(src, chunk_size), start, advance):
+            sizes.append(len(data))
+            yield data, position, final
+    read = written = 0
+    for out in ordered_map(fn, items(), workers, processes, max_in_flight):
+        dst.write(out)
+        read += sizes.popleft()
+        written += len(out)
+        if progress:
+            progress(read)
+    return read, written
+
+def transform_array(data, fn, chunk_size=CHUNK_SIZE, workers=WORKERS, max_in_flight=None):
+    # Same as transform_stream for an in-memory bytes object or NumPy array,
+    # on threads only. Returns the chunk results joined in order.
+    n = len(data)
+    items = ((data[i:i + chunk_size], i, i + chunk_size >= n) for i in range(0, max(n, 1), chunk_size))
+    parts = list(ordered_map(fn, items, workers, False, max_in_flight))
+    if isinstance(parts[0], np.ndarray):
+        return np.concatenate(parts)
+    return b"".join(parts)
@@ -1,6 +1,185 @@
 import streamlit as st
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
 
-def rc4(key, text):
+try:
+    from Crypto.Cipher import ARC4
+except ImportError:
+    ARC4 = None
+
+CHUNK_SIZE = 64 * 1024
+
+# "auto" uses pycryptodome's ARC4 whenever it accepts the key and falls back
+# to the pure-Python RC4 class otherwise; "native" or "python" force one.
+RC4_BACKEND = os.environ.get("RC4_BACKEND", "auto")
+
+# Memory budget of the keystream cache; RC4_CACHE_BYTES=0 disables it.
+RC4_CACHE_BYTES = int(os.environ.get("RC4_CACHE_BYTES", 16 * 1024 * 1024))
+
+def xor_bytes(data, stream):
+    # XORs data with the first len(data) keystream bytes in one big-int operation.
+    n = len(data)
+    return (int.from_bytes(data, "little") ^ int.from_bytes(stream[:n], "little")).to_bytes(n, "little")
+
+def key_bytes(key):
+    # Text keys use one byte per character (code point mod 256), as rc4()
+    # always has, so text and file modes accept the same keys.
+    if isinstance(key, str):
+        return bytes(ord(c) & 0xFF for c in key)
+    return bytes(key)
+
+class RC4:
+    # Stateful RC4 stream: S, i and j persist between update() calls, so a
+    # file can be processed chunk by chunk with constant memory. drop
+    # discards that many initial keystream bytes (RC4-drop[n]).
+    backend = "python"
+
+    def __init__(self, key, drop=0):
+        key = key_bytes(key)
+        if not key:
+            raise ValueError("RC4 key must not be empty.")
+        S = list(range(256))
+        j = 0
+        for i in range(256):
+            j = (j + S[i] + key[i % len(key)]) & 0xFF
+            S[i], S[j] = S[j], S[i]
+        self.S = S
+        self.i = 0
+        self.j = 0
+        if drop:
+            self.keystream(drop)
+
+    def keystream(self, n):
+        S, i, j = self.S, self.i, self.j
+        out = bytearray(n)
+        for k in range(n):
+            i = (i + 1) & 0xFF
+            si = S[i]
+            j = (j + si) & 0xFF
+            sj = S[j]
+            S[i] = sj
+            S[j] = si
+            out[k] = S[(si + sj) & 0xFF]
+        self.i, self.j = i, j
+        return bytes(out)
+
+    def update(self, data):
+        data = bytes(data)
+        return xor_bytes(data, self.keystream(len(data)))
+
+class NativeRC4:
+    # Same interface as RC4, backed by Crypto.Cipher.ARC4.
+    backend = "native"
+
+    def __init__(self, key, drop=0):
+        self._cipher = ARC4.new(key_bytes(key), drop=drop)
+
+    def keystream(self, n):
+        return self._cipher.encrypt(bytes(n))
+
+    def update(self, data):
+        return self._cipher.encrypt(bytes(data))
+
+def native_supported(key):
+    return ARC4 is not None and len(key_bytes(key)) in ARC4.key_size
+
+def new_rc4(key, drop=0, backend=None):
+    backend = backend or RC4_BACKEND
+    if backend not in ("auto", "native", "python"):
+        raise ValueError(f"Unknown RC4 backend: {backend}")
+    if backend != "python" and native_supported(key):
+        return NativeRC4(key, drop)
+    if backend == "native":
+        raise ValueError("The native ARC4 backend is unavailable or does not accept this key.")
+    return RC4(key, drop)
+
+def rc4_stream(src, dst, key, drop=0, chunk_size=CHUNK_SIZE, backend=None):
+    cipher = new_rc4(key, drop, backend)
+    total = 0
+    while True:
+        chunk = src.read(chunk_size)
+        if not chunk:
+            break
+        dst.write(cipher.update(chunk))
+        total += len(chunk)
+    return total
+
+class KeystreamCache:
+    # LRU of (key, drop) -> keystream prefix, bounded by total prefix bytes.
+    # Each entry keeps its generator, so a longer request extends the prefix
+    # instead of rerunning the key schedule. Requests larger than the whole
+    # budget bypass the cache.
+    def __init__(self, max_bytes=RC4_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.extensions = 0
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.max_bytes > 0
+
+    def keystream(self, key, n, drop=0, backend=None):
+        if n > self.max_bytes:
+            return new_rc4(key, drop, backend).keystream(n)
+        cache_key = (key_bytes(key), drop)
+        with self._lock:
+            entry = self.entries.get(cache_key)
+            if entry is None:
+                self.misses += 1
+                entry = self.entries[cache_key] = [new_rc4(key, drop, backend), bytearray()]
+            elif len(entry[1]) >= n:
+                self.hits += 1
+            else:
+                self.extensions += 1
+            self.entries.move_to_end(cache_key)
+            cipher, prefix = entry
+            if len(prefix) < n:
+                grow = n - len(prefix)
+                prefix += cipher.keystream(grow)
+                self.total_bytes += grow
+            stream = bytes(prefix[:n])
+            while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+                _, (_, evicted) = self.entries.popitem(last=False)
+                self.total_bytes -= len(evicted)
+            return stream
+
+    def clear(self):
+        with self._lock:
+            self.entries.clear()
+            self.total_bytes = 0
+            self.hits = 0
+            self.misses = 0
+            self.extensions = 0
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses + self.extensions
+        return self.hits / lookups if lookups else 0.0
+
+KEYSTREAM_CACHE = KeystreamCache()
+
+def rc4(key, text, drop=0, backend=None, use_cache=True):
+    if use_cache and KEYSTREAM_CACHE.enabled:
+        stream = KEYSTREAM_CACHE.keystream(key, len(text), drop, backend)
+    else:
+        stream = new_rc4(key, drop, backend).keystream(len(text))
+    try:
+        data = text.encode("latin-1")
+    except UnicodeEncodeError:
+        # Characters above U+00FF keep their high bits, as before.
+        return ''.join(chr(ord(c) ^ k) for c, k in zip(text, stream))
+    return xor_bytes(data, stream).decode("latin-1")
+
+def rc4_reference(key, text, drop=0):
+    # The original per-character implementation, kept as the reference the
+    # faster paths are checked against. drop discards that many keystream
+    # bytes first.
     S = list(range(256))
     j = 0
     key_bytes = [ord(c) for c in key]
@@ -12,6 +191,10 @@ def rc4(key, text):
 
     i = 0
     j = 0
+    for _ in range(drop):
+        i = (i + 1) % 256
+        j = (j + S[i]) % 256
+        S[i], S[j] = S[j], S[i]
     result = []
     for char in text:
         i = (i + 1) % 256
@@ -21,6 +204,57 @@ def rc4(key, text):
         result.append(chr(ord(char) ^ K))
     return ''.join(result)
 
+# Known-answer keystream bytes from RFC 6229: (key, offset, 16 bytes).
+RFC6229_VECTORS = [
+    ("0102030405", 0, "b2396305f03dc027ccc3524a0a1118a8"),
+    ("0102030405", 16, "6982944f18fc82d589c403a47a0d0919"),
+    ("0102030405", 240, "28cb1132c96ce286421dcaadb8b69eae"),
+    ("0102030405", 256, "1cfcf62b03eddb641d77dfcf7f8d8c93"),
+    ("0102030405060708090a0b0c0d0e0f10", 0, "9ac7cc9a609d1ef7b2932899cde41b97"),
+    ("0102030405060708090a0b0c0d0e0f10", 16, "5248c4959014126a6e8a84f11d1a9e1c"),
+    ("0102030405060708090a0b0c0d0e0f101112131415161718191a1b1c1d1e1f20", 0, "eaa6bd25880bf93d3f5d1e4ca2611d91"),
+    ("0102030405060708090a0b0c0d0e0f101112131415161718191a1b1c1d1e1f20", 16, "cfa45c9f7e714b54bdfa80027cb14380"),
+]
+
+def check_backends(key_lengths=(1, 2, 5, 16, 40, 128, 256), size=4096, drops=(0, 768)):
+    # Checks every backend against the RFC 6229 vectors, then the text rc4()
+    # path of each backend against rc4_reference() on random keys and text
+    # (including characters above U+00FF). Returns a list of mismatch
+    # descriptions (empty when everything agrees).
+    mismatches = []
+    backends = ["python"] + (["native"] if ARC4 is not None else [])
+    for key_hex, offset, expected in RFC6229_VECTORS:
+        key = bytes.fromhex(key_hex)
+        for backend in backends:
+            if backend == "native" and not native_supported(key):
+                continue
+            if new_rc4(key, offset, backend).keystream(16).hex() != expected:
+                mismatches.append(f"{backend} keystream differs from RFC 6229 for key {key_hex} at offset {offset}")
+    text = os.urandom(size).decode("latin-1") + "Ωλ€😀"
+    for length in key_lengths:
+        text_key = os.urandom(length).decode("latin-1")
+        for drop in drops:
+            expected = rc4_reference(text_key, text, drop)
+            for backend in backends:
+                if backend == "native" and not native_supported(text_key):
+                    continue
+                if rc4(text_key, text, drop, backend, False) != expected:
+                    mismatches.append(f"{backend} rc4() differs from the reference for key length {length}, drop {drop}")
+    if ARC4 is None:
+        mismatches.append("pycryptodome is not installed; only the python backend was checked")
+    return mismatches
+
+def benchmark(size=1024 * 1024, key=b"benchmark key"):
+    data = os.urandom(size)
+    timings = {}
+    for backend in ("python", "native"):
+        if backend == "native" and not native_supported(key):
+            continue
+        start = time.perf_counter()
+        new_rc4(key, backend=backend).update(data)
+        timings[backend] = time.perf_counter() - start
+    return timings
+
 def render():
     st.title("🔐 RC4 Stream Cipher")
     st.write("Encrypt or decrypt a message using the RC4 stream cipher.")
@@ -76,7 +310,7 @@ def render():
     input_type = st.radio("Input type:", ["Text", "File"])
 
     text = ""
-    filename = None
+    uploaded_file = None
 
     if input_type == "Text":
         if mode == "Encrypt":
@@ -84,24 +318,59 @@ def render():
         else:
             text = st.text_area("Enter ciphertext:")
     else:
-        uploaded_file = st.file_uploader("Upload a .txt file", type=["txt"])
-        if uploaded_file:
-            text = uploaded_file.read().decode("utf-8")
-            filename = uploaded_file.name
+        uploaded_file = st.file_uploader("Upload a file (any type)")
 
     key = st.text_input("Enter the secret key (any length):", max_chars=256)
+    drop = st.number_input("Discard initial keystream bytes (RC4-drop, 0 = plain RC4):",
+                           min_value=0, max_value=4096, value=0, step=256)
+
+    if key:
+        backend = "native" if RC4_BACKEND != "python" and native_supported(key) else "python"
+        st.caption(f"⚙️ RC4 backend: **{backend}** (set RC4_BACKEND=auto|native|python to change)")
+
+    use_cache = st.checkbox("Reuse cached keystreams for repeated keys", value=KEYSTREAM_CACHE.enabled,
+                            disabled=not KEYSTREAM_CACHE.enabled)
 
     if st.button(f"Run RC4 {mode}"):
-        if not text.strip():
-            st.error("Please enter some text or upload a file.")
-        elif not key:
+        if not key:
             st.error("Please enter a secret key.")
+        elif RC4_BACKEND == "native" and not native_supported(key):
+            st.error("The native RC4 backend is forced but does not accept this key.")
+        elif uploaded_file is not None:
+            uploaded_file.seek(0)
+            with tempfile.SpooledTemporaryFile(max_size=64 * 1024 * 1024) as out:
+                rc4_stream(uploaded_file, out, key, drop)
+                out.seek(0)
+                st.success("✅ Operation successful!")
+                st.download_button("📥 Download Result", data=out.read(),
+                                   file_name=f"{mode.lower()}ed_{uploaded_file.name}",
+                                   mime="application/octet-stream")
+        elif not text.strip():
+            st.error("Please enter some text or upload a file.")
         else:
-            result = rc4(key, text)
+            result = rc4(key, text, drop, use_cache=use_cache)
             st.success("✅ Operation successful!")
             st.text_area("Result:", value=result, height=200)
 
+    if KEYSTREAM_CACHE.enabled:
+        cache = KEYSTREAM_CACHE
+        st.caption(f"🗃️ Keystream cache: {cache.hits} hits · {cache.extensions} extensions · {cache.misses} misses "
+                   f"({cache.hit_rate():.0%} hit rate) · {len(cache.entries)} keys, {cache.total_bytes:,} bytes")
+        if st.button("🧹 Clear keystream cache"):
+            cache.clear()
+            st.rerun()
+
     st.markdown("---")
     if st.button("⬅️ Back to Symmetric Algorithms"):
         st.session_state.sym_page = "menu"
         st.rerun()
+
+if __name__ == "__main__":
+    problems = check_backends()
+    print("backends match RFC 6229 and the reference" if not problems else "\n".join(problems))
+    for size in (64 * 1024, 1024 * 1024):
+        timings = benchmark(size)
+        line = ", ".join(f"{name}: {size / seconds / 1e6:.1f} MB/s" for name, seconds in timings.items())
+        if "native" in timings:
+            line += f" (native {timings['python'] / timings['native']:.0f}x faster)"
+        print(f"{size // 1024} KiB -> {line}")
@@ -1,21 +1,298 @@
 import streamlit as st
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+import hashlib
+import json
+import mmap
+import os
 import re
-import random
+import tempfile
+import threading
+from collections import deque
+from contextlib import contextmanager
+from functools import partial
+from symmetric.parallel import WORKERS, transform_array
+
+# Compact binary format for digit strings (ciphertext or pad): the magic,
+# the digit count as a little-endian uint64, then two digits per byte,
+# high nibble first, with a zero nibble after an odd last digit.
+PACK_MAGIC = b"VDG1"
+PACK_HEADER = 12
+
+# Digits kept ready by the background pad pool; VERNAM_POOL_DIGITS=0 disables it.
+POOL_DIGITS = int(os.environ.get("VERNAM_POOL_DIGITS", 4 * 1024 * 1024))
+POOL_BLOCK = 256 * 1024
+PAD_CHUNK_DIGITS = 2 * 1024 * 1024
+KEY_PREVIEW_DIGITS = 30000
+
+# Pad files live only in this directory; the page accepts bare file names.
+PAD_DIR = os.environ.get("VERNAM_PAD_DIR", "vernam_pads")
+PAD_NAME = re.compile(r"[A-Za-z0-9_-][A-Za-z0-9_.-]*\.vdg")
+
+_ledger_locks = {}
+_ledger_locks_guard = threading.Lock()
+
+def text_to_digits(text):
+    # Each character becomes its code point as three decimal digits.
+    codes = np.frombuffer(text.encode("utf-32-le", "surrogatepass"), dtype="<u4")
+    if codes.size and codes.max() > 999:
+        raise ValueError("Only characters with code points up to 999 fit the 3-digit encoding.")
+    return np.stack([codes // 100, codes // 10 % 10, codes % 10], axis=1).astype(np.uint8).ravel()
+
+def digits_to_text(digits):
+    if len(digits) % 3:
+        raise ValueError("Digit count must be a multiple of 3.")
+    d = np.asarray(digits, dtype="<u4").reshape(-1, 3)
+    return (d[:, 0] * 100 + d[:, 1] * 10 + d[:, 2]).astype("<u4").tobytes().decode("utf-32-le", "surrogatepass")
+
+def digits_from_str(digit_str):
+    if not digit_str.isascii():
+        raise ValueError("Digit strings may only contain 0-9.")
+    digits = np.frombuffer(digit_str.encode("ascii"), dtype=np.uint8) - np.uint8(ord('0'))
+    if digits.size and digits.max() > 9:
+        raise ValueError("Digit strings may only contain 0-9.")
+    return digits
+
+def digits_to_str(digits):
+    return (np.asarray(digits, dtype=np.uint8) + np.uint8(ord('0'))).tobytes().decode("ascii")
+
+def vernam_encrypt_digits(plain, pad):
+    n = min(len(plain), len(pad))
+    return (plain[:n] + np.uint8(10) - pad[:n]) % np.uint8(10)
+
+def vernam_decrypt_digits(cipher, pad):
+    n = min(len(cipher), len(pad))
+    return (cipher[:n] + pad[:n]) % np.uint8(10)
+
+def vernam_chunk(data, position, final, pad, decrypt=False):
+    # Chunk function for the parallel executor: the pad segment of a chunk
+    # starts at the chunk's digit offset.
+    segment = pad[position:position + len(data)]
+    return vernam_decrypt_digits(data, segment) if decrypt else vernam_encrypt_digits(data, segment)
+
+def vernam_parallel(digits, pad, decrypt=False, chunk_size=4 * 1024 * 1024, workers=WORKERS):
+    return transform_array(digits, partial(vernam_chunk, pad=pad, decrypt=decrypt), chunk_size, workers)
+
+def pack_digits(digits):
+    digits = np.asarray(digits, dtype=np.uint8)
+    padded = np.concatenate([digits, np.zeros(len(digits) % 2, dtype=np.uint8)])
+    packed = (padded[0::2] << 4) | padded[1::2]
+    return PACK_MAGIC + len(digits).to_bytes(8, "little") + packed.tobytes()
+
+def unpack_digits(blob):
+    if blob[:4] != PACK_MAGIC or len(blob) < 12:
+        raise ValueError("Not a packed Vernam digit file.")
+    count = int.from_bytes(blob[4:12], "little")
+    packed = np.frombuffer(blob, dtype=np.uint8, offset=PACK_HEADER)
+    if len(packed) != (count + 1) // 2:
+        raise ValueError("Packed digit file is truncated.")
+    return _unpack_nibbles(packed)[:count]
+
+def _unpack_nibbles(packed):
+    digits = np.empty(len(packed) * 2, dtype=np.uint8)
+    digits[0::2] = packed >> 4
+    digits[1::2] = packed & 0x0F
+    if digits.size and digits.max() > 9:
+        raise ValueError("Packed digit file contains invalid digits.")
+    return digits
 
 def text_to_ascii(text):
-    return ''.join(f"{ord(c):03}" for c in text)
+    return digits_to_str(text_to_digits(text))
 
 def ascii_to_text(ascii_str):
-    return ''.join(chr(int(ascii_str[i:i+3])) for i in range(0, len(ascii_str), 3))
+    return digits_to_text(digits_from_str(ascii_str))
 
 def encrypt_vernam(ascii_text, key):
-    return ''.join(str((int(a) - int(k)) % 10) for a, k in zip(ascii_text, key))
+    return digits_to_str(vernam_encrypt_digits(digits_from_str(ascii_text), digits_from_str(key)))
 
 def decrypt_vernam(cipher_text, key):
-    return ''.join(str((int(c) + int(k)) % 10) for c, k in zip(cipher_text, key))
+    return digits_to_str(vernam_decrypt_digits(digits_from_str(cipher_text), digits_from_str(key)))
+
+def random_digits(n, base=10):
+    # n uniform values in [0, base) from os.urandom. Bytes at or above the
+    # largest multiple of base are rejected so the modulo stays unbiased.
+    limit = 256 - 256 % base
+    out = np.empty(n, dtype=np.uint8)
+    filled = 0
+    while filled < n:
+        need = n - filled
+        raw = np.frombuffer(os.urandom(need * 256 // limit + 64), dtype=np.uint8)
+        if limit < 256:
+            raw = raw[raw < limit][:need] % np.uint8(base)
+        raw = raw[:need]
+        out[filled:filled + len(raw)] = raw
+        filled += len(raw)
+    return out
+
+class PadPool:
+    # Keeps up to target random digits generated ahead of time on a daemon
+    # thread. take() hands out pooled blocks first (each block is handed out
+    # once) and generates any shortfall inline.
+    def __init__(self, target=POOL_DIGITS, block=POOL_BLOCK):
+        self.target = target
+        self.block = block
+        self.blocks = deque()
+        self.available = 0
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def start(self):
+        if self.target <= 0 or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._fill, name="vernam-pad-pool", daemon=True)
+        self._thread.start()
+
+    def _fill(self):
+        while True:
+            with self._cond:
+                while self.available >= self.target:
+                    self._cond.wait()
+            block = random_digits(self.block)
+            with self._cond:
+                self.blocks.append(block)
+                self.available += len(block)
+
+    def take(self, n):
+        self.start()
+        parts = []
+        need = n
+        with self._cond:
+            while need and self.blocks:
+                block = self.blocks.popleft()
+                if len(block) > need:
+                    self.blocks.appendleft(block[need:])
+                    block = block[:need]
+                parts.append(block)
+                need -= len(block)
+                self.available -= len(block)
+            self._cond.notify()
+        if need:
+            parts.append(random_digits(need))
+        return np.concatenate(parts) if parts else np.empty(0, dtype=np.uint8)
+
+PAD_POOL = PadPool()
+
+def generate_pad(length):
+    return PAD_POOL.take(length)
 
 def generate_random_key(length):
-    return ''.join(str(random.randint(0,9)) for _ in range(length))
+    return digits_to_str(generate_pad(length))
+
+def pad_path(name):
+    # Maps a pad file name from the page onto PAD_DIR, refusing anything
+    # that could point elsewhere (separators, "..", hidden files).
+    if not PAD_NAME.fullmatch(name or ""):
+        raise ValueError("Pad names may only use letters, digits, '_', '-' and '.', and must end in .vdg.")
+    os.makedirs(PAD_DIR, exist_ok=True)
+    return os.path.join(PAD_DIR, name)
+
+@contextmanager
+def _ledger_lock(ledger_path):
+    # Serializes ledger updates across PadFile instances, threads and
+    # processes: a lock per absolute path inside this process plus an
+    # flock on <ledger>.lock (where fcntl exists) for other processes.
+    key = os.path.abspath(ledger_path)
+    with _ledger_locks_guard:
+        lock = _ledger_locks.setdefault(key, threading.Lock())
+    with lock:
+        if fcntl is None:
+            yield
+            return
+        with open(key + ".lock", "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+def create_pad_file(path, length, chunk_digits=PAD_CHUNK_DIGITS):
+    # Writes a fresh pad of length random digits in the packed format,
+    # chunk by chunk so large pads never sit in memory. Refuses to replace
+    # an existing pad, and starts a new ledger next to it.
+    chunk_digits -= chunk_digits % 2
+    with open(path, "xb") as f:
+        f.write(PACK_MAGIC + length.to_bytes(8, "little"))
+        for start in range(0, length, chunk_digits):
+            f.write(pack_digits(random_digits(min(chunk_digits, length - start)))[PACK_HEADER:])
+    pad = PadFile(path)
+    with _ledger_lock(pad.ledger_path):
+        pad._save_ledger([])
+    return pad
+
+class PadFile:
+    # A packed pad on disk, read through mmap, plus a JSON ledger
+    # (<path>.ledger) of the [start, end) digit ranges already handed out.
+    # consume() only ever hands out digits past every recorded range, so a
+    # pad segment is never used twice; read() fetches a recorded segment
+    # again for decryption.
+    def __init__(self, path):
+        self.path = path
+        self.ledger_path = path + ".ledger"
+        with open(path, "rb") as f:
+            header = f.read(PACK_HEADER)
+            f.seek(0, os.SEEK_END)
+            size = f.tell()
+        if len(header) < PACK_HEADER or header[:4] != PACK_MAGIC:
+            raise ValueError("Not a packed Vernam pad file.")
+        self.length = int.from_bytes(header[4:12], "little")
+        if size - PACK_HEADER != (self.length + 1) // 2:
+            raise ValueError("Pad file is truncated.")
+
+    def _load_ledger(self):
+        try:
+            with open(self.ledger_path) as f:
+                return json.load(f)["used"]
+        except FileNotFoundError:
+            return []
+
+    def _save_ledger(self, used):
+        # Callers hold _ledger_lock; the unique temp file keeps the replace atomic.
+        fd, tmp = tempfile.mkstemp(prefix=os.path.basename(self.ledger_path) + ".",
+                                   suffix=".tmp", dir=os.path.dirname(self.ledger_path) or ".")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump({"pad_digits": self.length, "used": used}, f)
+            os.replace(tmp, self.ledger_path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    def used(self):
+        return self._load_ledger()
+
+    def next_offset(self):
+        return max((end for _, end in self._load_ledger()), default=0)
+
+    def remaining(self):
+        return self.length - self.next_offset()
+
+    def read(self, offset, length):
+        if offset < 0 or offset + length > self.length:
+            raise ValueError("Segment lies outside the pad.")
+        if not length:
+            return np.empty(0, dtype=np.uint8)
+        first = PACK_HEADER + offset // 2
+        last = PACK_HEADER + (offset + length + 1) // 2
+        with open(self.path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            packed = np.frombuffer(mm[first:last], dtype=np.uint8)
+        skip = offset % 2
+        return _unpack_nibbles(packed)[skip:skip + length]
+
+    def consume(self, length):
+        # Returns (offset, digits) and records the range before handing it out.
+        with _ledger_lock(self.ledger_path):
+            used = self._load_ledger()
+            offset = max((end for _, end in used), default=0)
+            if offset + length > self.length:
+                raise ValueError(f"Pad has only {self.length - offset} unused digits left.")
+            used.append([offset, offset + length])
+            self._save_ledger(used)
+        return offset, self.read(offset, length)
 
 def render():
     st.title("🔐 Vernam Cipher (One-Time Pad)")
@@ -79,48 +356,147 @@ def render():
             if uploaded_file:
                 text = uploaded_file.read().decode("utf-8")
 
+        plain_digits = None
         if text:
-            ascii_str = text_to_ascii(text)
-            key_length = len(ascii_str)
+            try:
+                plain_digits = text_to_digits(text)
+            except ValueError as e:
+                st.error(f"❌ {e}")
 
-            generate_key = st.checkbox("Generate random key", value=True)
-            if generate_key:
-                key_input = generate_random_key(key_length)
-                st.text_area("Generated Key (remember this!)", key_input, height=80)
-            else:
+        if plain_digits is not None:
+            key_length = len(plain_digits)
+
+            key_source = st.radio("Key source", ["Generate random key", "Enter key", "Pad file"], horizontal=True)
+            pad = None
+            pad_file = None
+            if key_source == "Generate random key":
+                # The generated pad lives in session_state so reruns (button
+                # clicks, downloads) keep showing the same key, but only for
+                # the message it was generated for and only until it has
+                # encrypted once: a pad is never used for two messages.
+                new_key = st.button("🎲 New key")
+                message = hashlib.sha256(plain_digits.tobytes()).hexdigest()
+                generated = st.session_state.get("vernam_generated_pad")
+                if new_key or generated is None or generated["message"] != message or generated["used"]:
+                    generated = st.session_state.vernam_generated_pad = {
+                        "pad": generate_pad(key_length), "message": message, "used": False}
+                pad = generated["pad"]
+                if key_length <= KEY_PREVIEW_DIGITS:
+                    st.text_area("Generated Key (remember this!)", digits_to_str(pad), height=80)
+                else:
+                    st.caption(f"Generated a {key_length:,}-digit key; download it with the ciphertext.")
+            elif key_source == "Enter key":
                 key_input = st.text_input(f"Enter a numeric key exactly {key_length} digits long:")
+            else:
+                pad_name = st.text_input(f"Pad file name (stored in {PAD_DIR}/):", value="pad.vdg")
+                try:
+                    path = pad_path(pad_name)
+                except ValueError as e:
+                    st.error(f"❌ {e}")
+                    path = None
+                if path is not None and os.path.exists(path):
+                    try:
+                        pad_file = PadFile(path)
+                        st.caption(f"{pad_file.remaining():,} of {pad_file.length:,} pad digits unused; "
+                                   f"the next message starts at offset {pad_file.next_offset():,}.")
+                    except ValueError as e:
+                        st.error(f"❌ {e}")
+                elif path is not None:
+                    pad_digits = st.number_input("Pad size (digits):", min_value=key_length,
+                                                 value=max(key_length, 1_000_000), step=100_000)
+                    if st.button("🗂️ Create pad file"):
+                        pad_file = create_pad_file(path, int(pad_digits))
+                        st.success(f"Created {pad_name} with {pad_file.length:,} random digits.")
+
+            output_format = st.radio("Output format", ["Decimal text", "Compact binary"], horizontal=True)
 
             if st.button("🔒 Encrypt"):
                 if not text.strip():
                     st.error("Please enter or upload some text.")
                     return
-                if not key_input or len(key_input) != key_length:
-                    st.error(f"Key must be exactly {key_length} digits long.")
-                    return
-                if not re.fullmatch(r'\d+', key_input):
-                    st.error("Key must be numeric.")
-                    return
-                cipher = encrypt_vernam(ascii_str, key_input)
+                if key_source == "Enter key":
+                    if not key_input or len(key_input) != key_length:
+                        st.error(f"Key must be exactly {key_length} digits long.")
+                        return
+                    if not re.fullmatch(r'[0-9]+', key_input):
+                        st.error("Key must be numeric.")
+                        return
+                    pad = digits_from_str(key_input)
+                elif key_source == "Pad file":
+                    if pad_file is None:
+                        st.error("Please create or choose a pad file.")
+                        return
+                    try:
+                        offset, pad = pad_file.consume(key_length)
+                    except ValueError as e:
+                        st.error(f"❌ {e}")
+                        return
+                    st.info(f"Used pad digits {offset:,} to {offset + key_length:,}. "
+                            f"Decrypt with pad offset **{offset}**.")
+                cipher = vernam_parallel(plain_digits, pad)
+                if key_source == "Generate random key":
+                    st.session_state.vernam_generated_pad["used"] = True
                 st.success("Encryption successful!")
-                st.text_area("Cipher Text", cipher, height=150)
-        else:
+                if output_format == "Decimal text":
+                    st.text_area("Cipher Text", digits_to_str(cipher), height=150)
+                else:
+                    st.download_button("📥 Download Ciphertext (.vdg)", data=pack_digits(cipher),
+                                       file_name="ciphertext.vdg", mime="application/octet-stream")
+                if key_source != "Pad file" and (output_format != "Decimal text" or key_length > KEY_PREVIEW_DIGITS):
+                    st.download_button("📥 Download Key Pad (.vdg)", data=pack_digits(pad),
+                                       file_name="pad.vdg", mime="application/octet-stream")
+        elif not text:
             st.info("Enter or upload text to enable key input.")
 
     else: 
-        key_input = st.text_input("Enter the numeric key:")
-        cipher_input = st.text_area("Enter the cipher text:")
+        input_format = st.radio("Input format", ["Decimal text", "Compact binary", "Pad file"], horizontal=True)
+        if input_format == "Decimal text":
+            key_input = st.text_input("Enter the numeric key:")
+            cipher_input = st.text_area("Enter the cipher text:")
+        elif input_format == "Compact binary":
+            pad_file = st.file_uploader("Upload the key pad (.vdg)", key="vernam_pad")
+            cipher_file = st.file_uploader("Upload the ciphertext (.vdg)", key="vernam_cipher")
+        else:
+            pad_name = st.text_input(f"Pad file name (stored in {PAD_DIR}/):", value="pad.vdg")
+            pad_offset = st.number_input("Pad offset:", min_value=0, value=0)
+            cipher_file = st.file_uploader("Upload the ciphertext (.vdg)", key="vernam_cipher")
 
         if st.button("🔓 Decrypt"):
-            if not re.fullmatch(r'\d+', key_input) or not re.fullmatch(r'\d+', cipher_input):
-                st.error("Key and ciphertext must be numeric.")
-                return
-            if len(key_input) != len(cipher_input):
+            if input_format == "Decimal text":
+                if not re.fullmatch(r'[0-9]+', key_input) or not re.fullmatch(r'[0-9]+', cipher_input):
+                    st.error("Key and ciphertext must be numeric.")
+                    return
+                pad, cipher = digits_from_str(key_input), digits_from_str(cipher_input)
+            elif input_format == "Compact binary":
+                if pad_file is None or cipher_file is None:
+                    st.error("Please upload both the key pad and the ciphertext.")
+                    return
+                try:
+                    pad, cipher = unpack_digits(pad_file.getvalue()), unpack_digits(cipher_file.getvalue())
+                except ValueError as e:
+                    st.error(f"❌ {e}")
+                    return
+            else:
+                try:
+                    path = pad_path(pad_name)
+                except ValueError as e:
+                    st.error(f"❌ {e}")
+                    return
+                if cipher_file is None or not os.path.exists(path):
+                    st.error("Please upload the ciphertext and give an existing pad file.")
+                    return
+                try:
+                    cipher = unpack_digits(cipher_file.getvalue())
+                    pad = PadFile(path).read(int(pad_offset), len(cipher))
+                except ValueError as e:
+                    st.error(f"❌ {e}")
+                    return
+            if len(pad) != len(cipher):
                 st.error("Key length must match ciphertext length.")
                 return
 
-            ascii_recovered = decrypt_vernam(cipher_input, key_input)
             try:
-                plain = ascii_to_text(ascii_recovered)
+                plain = digits_to_text(vernam_parallel(cipher, pad, decrypt=True))
                 st.success("Decryption successful!")
                 st.text_area("Decrypted Text", plain, height=150)
             except Exception:
@@ -1,32 +1,182 @@
 import streamlit as st
+import numpy as np
+import tempfile
+from functools import partial
+from symmetric.caesar import shift_scores
+from symmetric.parallel import WORKERS, transform_stream
+
+CHUNK_SIZE = 1024 * 1024
+PREVIEW_BYTES = 5000
+ENGLISH_IOC = 0.0667
+ANALYSIS_BYTES = 4 * 1024 * 1024
 
 def format_key(text, key):
     key = key.upper()
     return (key * (len(text) // len(key) + 1))[:len(text)]
 
-def encrypt_vigenere(plain_text, key):
-    plain_text = plain_text.upper()
-    key = format_key(plain_text, key)
-    encrypted = ""
+def key_shifts(key):
+    try:
+        shifts = np.frombuffer(key.upper().encode("ascii"), dtype=np.uint8) - np.uint8(ord('A'))
+    except UnicodeEncodeError:
+        shifts = np.array([], dtype=np.uint8)
+    if not len(shifts) or shifts.max() > 25:
+        raise ValueError("Keyword must contain letters only.")
+    return shifts
 
-    for p, k in zip(plain_text, key):
-        if p.isalpha():
-            encrypted += chr((ord(p) - ord('A') + ord(k) - ord('A')) % 26 + ord('A'))
-        else:
-            encrypted += p
-    return encrypted
+def vigenere_transform(data, key, decrypt=False, offset=0, lowercase=False):
+    # Vectorized Vigenère over UTF-8 bytes. The key advances once per
+    # character (letters or not), so offset is the number of characters that
+    # came before data. ASCII letters come out upper case (or lower case);
+    # every other byte passes through unchanged. Returns (output bytes,
+    # offset for the next chunk).
+    shifts = key_shifts(key) if isinstance(key, str) else key
+    data = bytes(data)
+    arr = np.frombuffer(data, dtype=np.uint8)
+    period = len(shifts)
+    if data.isascii():
+        # One byte per character: tile the key instead of indexing it.
+        start = offset % period
+        k = np.tile(shifts, (start + len(arr)) // period + 1)[start:start + len(arr)]
+        count = len(arr)
+    else:
+        # Key position of each byte is the number of UTF-8 lead bytes so far.
+        chars = np.cumsum((arr & 0xC0) != 0x80)
+        k = shifts[(chars - 1 + offset) % period]
+        count = int(chars[-1])
+    if decrypt:
+        k = np.uint8(26) - k
+    value = (arr | np.uint8(0x20)) - np.uint8(ord('a'))
+    letters = value < 26
+    value += k
+    np.subtract(value, np.uint8(26), out=value, where=value >= 26)
+    value += np.uint8(ord('a') if lowercase else ord('A'))
+    return np.where(letters, value, arr).tobytes(), offset + count
+
+def char_count(data):
+    # Number of UTF-8 characters (lead bytes) in a byte string.
+    if data.isascii():
+        return len(data)
+    return int(np.count_nonzero((np.frombuffer(data, dtype=np.uint8) & 0xC0) != 0x80))
+
+def vigenere_chunk(data, position, final, shifts, decrypt=False, lowercase=False):
+    return vigenere_transform(data, shifts, decrypt, position, lowercase)[0]
+
+def vigenere_stream(src, dst, key, mode="encrypt", chunk_size=CHUNK_SIZE, workers=1):
+    # Processes a binary file object chunk by chunk. Each chunk's key offset
+    # is the character count of everything before it, which the reader
+    # works out in order, so the chunks themselves can run on threads.
+    # Returns the number of characters processed.
+    offsets = [0]
+    def advance(data, position):
+        offsets[0] = position + char_count(data)
+        return offsets[0]
+    fn = partial(vigenere_chunk, shifts=key_shifts(key), decrypt=mode == "decrypt")
+    transform_stream(src, dst, fn, chunk_size, advance=advance, workers=workers)
+    return offsets[0]
+
+# Only ASCII letters are shifted. The old loop's isalpha() check also
+# pulled non-ASCII letters such as 'É' into the A-Z range, where they could
+# not be decrypted back; they now pass through unchanged like other
+# non-letters. Output is otherwise the same as before.
+def encrypt_vigenere(plain_text, key):
+    encrypted, _ = vigenere_transform(plain_text.upper().encode("utf-8", "surrogatepass"), key)
+    return encrypted.decode("utf-8", "surrogatepass")
 
 def decrypt_vigenere(cipher_text, key):
-    cipher_text = cipher_text.upper()
-    key = format_key(cipher_text, key)
-    decrypted = ""
+    decrypted, _ = vigenere_transform(cipher_text.upper().encode("utf-8", "surrogatepass"), key, decrypt=True)
+    return decrypted.decode("utf-8", "surrogatepass")
 
-    for c, k in zip(cipher_text, key):
-        if c.isalpha():
-            decrypted += chr((ord(c) - ord(k) + 26) % 26 + ord('A'))
-        else:
-            decrypted += c
-    return decrypted
+def _letter_positions(data):
+    # Character positions and 0-25 values of the ASCII letters in data.
+    arr = np.frombuffer(data, dtype=np.uint8)
+    value = (arr | np.uint8(0x20)) - np.uint8(ord('a'))
+    letters = value < 26
+    if data.isascii():
+        positions = np.flatnonzero(letters)
+    else:
+        positions = (np.cumsum((arr & 0xC0) != 0x80) - 1)[letters]
+    return positions, value[letters]
+
+def _column_counts(positions, values, length):
+    # Letter histogram of every key column: one bincount over column * 26 + letter.
+    return np.bincount((positions % length) * 26 + values, minlength=26 * length).reshape(length, 26)
+
+def index_of_coincidence(positions, values, length):
+    counts = _column_counts(positions, values, length)
+    n = counts.sum(axis=1)
+    usable = n > 1
+    if not usable.any():
+        return 0.0
+    return float(((counts * (counts - 1)).sum(axis=1)[usable] / (n * (n - 1))[usable]).mean())
+
+def kasiski_scores(positions, values, lengths, max_pairs=200_000):
+    # Repeated trigrams (three letters at consecutive character positions)
+    # are grouped by sorting their codes, which acts as a hash index from
+    # trigram to positions. Returns, for each candidate length, the share of
+    # distances between repeats that it divides.
+    lengths = np.asarray(lengths)
+    if len(values) < 3:
+        return np.zeros(len(lengths))
+    contiguous = positions[2:] - positions[:-2] == 2
+    codes = (values[:-2].astype(np.int32) * 676 + values[1:-1].astype(np.int32) * 26 + values[2:])[contiguous]
+    starts = positions[:-2][contiguous]
+    order = np.argsort(codes, kind="stable")
+    codes, starts = codes[order], starts[order]
+    distances = (starts[1:] - starts[:-1])[codes[1:] == codes[:-1]][:max_pairs]
+    if not len(distances):
+        return np.zeros(len(lengths))
+    return (distances[:, None] % lengths[None, :] == 0).mean(axis=0)
+
+def recover_key(positions, values, length):
+    # Best Caesar shift of every key column by chi-squared against English.
+    # Returns (key, mean chi-squared per letter) so lengths can be compared,
+    # or None when a column has no letters and its key letter is unknowable.
+    counts = _column_counts(positions, values, length)
+    if not counts.sum(axis=1).all():
+        return None
+    key = []
+    fit = []
+    for column in counts:
+        scores = shift_scores(column)
+        best = int(np.argmin(scores))
+        key.append(chr(ord('A') + best))
+        fit.append(scores[best] / column.sum())
+    return "".join(key), float(np.mean(fit))
+
+def _shortest_period(key):
+    for period in range(1, len(key)):
+        if len(key) % period == 0 and key[:period] * (len(key) // period) == key:
+            return key[:period]
+    return key
+
+def analyse_vigenere(text, max_length=20, candidates=5):
+    # Ranks likely keys for a ciphertext. Key lengths are scored by column
+    # index of coincidence (relative to English) plus the Kasiski share, then
+    # each length's key is recovered column by column. Keys that are
+    # repeats of a shorter key are folded into it.
+    data = text.upper().encode("utf-8", "surrogatepass") if isinstance(text, str) else bytes(text)
+    positions, values = _letter_positions(data)
+    if len(values) < 2:
+        return []
+    lengths = np.arange(1, max(1, min(max_length, len(values) // 2)) + 1)
+    kasiski = kasiski_scores(positions, values, lengths)
+    rows = []
+    for length, kas in zip(lengths, kasiski):
+        recovered = recover_key(positions, values, int(length))
+        if recovered is None:
+            continue
+        key, fit = recovered
+        ioc = index_of_coincidence(positions, values, int(length))
+        rows.append({"key": _shortest_period(key), "length": int(length), "ioc": ioc,
+                     "kasiski": float(kas), "fit": fit, "score": ioc / ENGLISH_IOC + float(kas)})
+    rows.sort(key=lambda row: row["score"], reverse=True)
+    ranked = []
+    seen = set()
+    for row in rows:
+        if row["key"] not in seen:
+            seen.add(row["key"])
+            ranked.append(row)
+    return ranked[:candidates]
 
 def render():
     st.title("🔐 Vigenère Cipher")
@@ -55,7 +205,7 @@ def render():
         - A = 0, B = 1, ..., Z = 25.
         - For encryption: `(Pi + Ki) mod 26`, where `Pi` is plaintext and `Ki` is keyword letter.
         - For decryption: `(Ci - Ki + 26) mod 26`, where `Ci` is ciphertext.
-        - Non-alphabetic characters are not encrypted and remain unchanged.
+        - Only the letters A-Z are encrypted; all other characters (including accented letters such as `É`) remain unchanged.
 
         ### 🛠️ Use Cases:
         - Used historically for military and diplomatic communication.
@@ -71,28 +221,66 @@ def render():
         """)
 
 
-    mode = st.radio("Mode", ["Encrypt", "Decrypt"])
+    mode = st.radio("Mode", ["Encrypt", "Decrypt", "Analyse"])
     input_method = st.radio("Input Method", ["Type Text", "Upload File"])
 
     text = ""
+    uploaded_file = None
     if input_method == "Type Text":
         text = st.text_area("Enter your text:")
     else:
         uploaded_file = st.file_uploader("Upload a .txt file", type="txt")
-        if uploaded_file:
-            text = uploaded_file.read().decode("utf-8")
 
-    key = st.text_input("Enter a keyword (letters only):")
+    if mode == "Analyse":
+        key = ""
+        max_length = st.slider("Longest key length to try:", min_value=2, max_value=40, value=20)
+    else:
+        key = st.text_input("Enter a keyword (letters only):")
 
     if st.button("🔐 Run"):
-        if not text.strip() or not key.strip():
+        has_input = uploaded_file is not None and uploaded_file.size if uploaded_file is not None else text.strip()
+        op = mode
+        if mode == "Analyse":
+            if not has_input:
+                st.error("Please enter or upload a ciphertext.")
+                return
+            if uploaded_file is not None:
+                uploaded_file.seek(0)
+                sample = uploaded_file.read(ANALYSIS_BYTES)
+            else:
+                sample = text
+            candidates = analyse_vigenere(sample, max_length)
+            if not candidates:
+                st.error("Not enough letters to analyse.")
+                return
+            st.info(f"🔎 Most likely keyword: **{candidates[0]['key']}**")
+            st.dataframe([
+                {"Keyword": row["key"], "Length": len(row["key"]), "Index of coincidence": round(row["ioc"], 4),
+                 "Kasiski": round(row["kasiski"], 3), "Chi-squared / letter": round(row["fit"], 4)}
+                for row in candidates
+            ], hide_index=True)
+            key, op = candidates[0]["key"], "Decrypt"
+
+        if not has_input or not key.strip():
             st.error("Please enter both text and a keyword.")
             return
-        if not key.isalpha():
+        if not key.isascii() or not key.isalpha():
             st.error("Keyword must contain letters only.")
             return
 
-        if mode == "Encrypt":
+        if uploaded_file is not None:
+            uploaded_file.seek(0)
+            with tempfile.SpooledTemporaryFile(max_size=64 * CHUNK_SIZE) as out:
+                vigenere_stream(uploaded_file, out, key, op.lower(),
+                                workers=WORKERS if uploaded_file.size > 8 * CHUNK_SIZE else 1)
+                out.seek(0)
+                preview = out.read(PREVIEW_BYTES).decode("utf-8", errors="replace")
+                out.seek(0)
+                st.success(f"{op}ion complete!")
+                st.text_area(f"{op}ed Text (preview)", preview, height=150)
+                st.download_button("📥 Download Result", data=out.read(),
+                                   file_name=f"{op.lower()}ed_{uploaded_file.name}", mime="text/plain")
+        elif op == "Encrypt":
             result = encrypt_vigenere(text, key)
             st.success("Encryption complete!")
             st.text_area("Encrypted Text", result, height=150)